@@ -1,12 +1,26 @@
+import argparse
+import bisect
+import hashlib
+import heapq
+import itertools
 import json
+import multiprocessing
 import re
 import os
+import sqlite3
 import string
+from array import array
 
 # --- Конфигурация ---
-INPUT_JSON_FILE = "data/raw_texts/scraped_texts.json"  # Имя вашего исходного файла
-OUTPUT_JSON_FILE = "data/annotated/spacy_training_data.json"
+INPUT_JSON_FILE = "data/raw_texts/scraped_texts.jsonl"  # Вывод scripts/scraper.py
+OUTPUT_JSON_FILE = "data/annotated/spacy_training_data.jsonl"  # Вход scripts/prepare_spacy_data.py
 LABEL = "PRODUCT"
+ANNOTATION_CACHE_FILE = "data/annotated/annotation_cache.sqlite"
+# Увеличивайте при изменении самих эвристик, чтобы сбросить кэш разметки
+HEURISTICS_VERSION = 1
+CACHE_BATCH_SIZE = 1000  # Записей на одну проверку кэша
+DEFAULT_CHUNK_SIZE = 16  # Записей на одну задачу процесса при --workers > 1
+PROGRESS_EVERY = 50  # Выводим прогресс каждые 50 записей
 
 
 # Ключевые слова - ЯКОРЯ (более строгий список основных типов)
@@ -758,6 +772,260 @@ EXCLUSION_KEYWORDS = set(
     ]
 )
 
+# Атрибуты с маленькой буквы, которые можно включать в конец названия
+# (размеры, цвета, материалы)
+ATTRIBUTE_WORDS = [
+    "king",
+    "queen",
+    "single",
+    "double",
+    "black",
+    "white",
+    "grey",
+    "blue",
+    "red",
+    "green",
+    "brown",
+    "ash",
+    "oak",
+    "walnut",
+    "metal",
+    "leather",
+    "fabric",
+    "timber",
+    "rattan",
+]
+
+# Сигналы конца названия после слова: цена и кнопки / подписи цены
+PRICE_PATTERN = r"(\$|€|£|₹|kr|rm|php|zar|sgd|aud|cad|nzd)\s?[\d,.]+"
+END_SIGNALS = [
+    "add to cart",
+    "view product",
+    "choose options",
+    "regular price",
+    "sale price",
+    "unit price",
+    "save",
+]
+LOOK_AHEAD_CHARS = 30  # Сколько символов после слова проверяем на цену/сигнал
+
+STRIP_CHARS = string.punctuation + " "
+LATIN_LETTER_PATTERN = re.compile(r"[a-zA-Z]")
+
+
+# --- Поиск якорей ---
+
+# Слово в смысле regex-границы \b: непрерывная последовательность символов \w
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class AnchorMatcher:
+    """
+    Автомат Ахо-Корасик над словами для поиска всех якорей за один проход.
+
+    Алфавит автомата - слова (последовательности \w), поэтому совпадение
+    автоматически ограничено границами слов, как у r"\bякорь\b". Слова
+    многословного якоря должны быть разделены ровно одним пробелом.
+    """
+
+    def __init__(self, anchors):
+        self.goto = [{}]
+        self.fail = [0]
+        # Для каждого состояния: список (якорь, число слов), заканчивающихся здесь
+        self.output = [[]]
+        # Якоря, которые нельзя разбить на слова (например, с пунктуацией),
+        # ищем как раньше - отдельным regex
+        self.fallback = []
+
+        for anchor in anchors:
+            anchor_lower = anchor.lower()
+            words = anchor_lower.split(" ")
+            if not all(WORD_PATTERN.fullmatch(word) for word in words):
+                self.fallback.append(
+                    (anchor, re.compile(r"\b" + re.escape(anchor_lower) + r"\b"))
+                )
+                continue
+            state = 0
+            for word in words:
+                next_state = self.goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][word] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((anchor, len(words)))
+
+        # Суффиксные ссылки строим обходом в ширину
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for word, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback_state = self.fail[state]
+                while fallback_state and word not in self.goto[fallback_state]:
+                    fallback_state = self.fail[fallback_state]
+                target = self.goto[fallback_state].get(word, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = (
+                    self.output[next_state] + self.output[self.fail[next_state]]
+                )
+
+        self.max_words = max(
+            (count for out in self.output for _, count in out), default=0
+        )
+
+    def find_all(self, text_lower):
+        """
+        Возвращает все вхождения якорей в text_lower, отсортированные по
+        началу, а при равном начале - от длинного якоря к короткому.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        word_starts = []  # Начала последних max_words слов
+        state = 0
+        prev_end = -2
+        for word_match in WORD_PATTERN.finditer(text_lower):
+            word_start, word_end = word_match.span()
+            word = word_match.group()
+            # Слова якоря разделены ровно одним пробелом - иначе начинаем заново
+            if word_start != prev_end + 1 or text_lower[prev_end] != " ":
+                state = 0
+                word_starts.clear()
+            prev_end = word_end
+            word_starts.append(word_start)
+            if len(word_starts) > self.max_words:
+                del word_starts[0]
+
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for anchor, count in output[state]:
+                matches.append(
+                    {"start": word_starts[-count], "end": word_end, "keyword": anchor}
+                )
+
+        for anchor, pattern in self.fallback:
+            for match in pattern.finditer(text_lower):
+                matches.append(
+                    {"start": match.start(), "end": match.end(), "keyword": anchor}
+                )
+
+        matches.sort(key=lambda x: (x["start"], x["start"] - x["end"]))
+        return matches
+
+
+ANCHOR_MATCHER = AnchorMatcher(PRODUCT_ANCHORS)
+
+
+class AnnotationRules:
+    """
+    Скомпилированный набор правил разметки: автомат якорей, замороженные
+    списки и готовые regex. Строится один раз и передается в get_potential_spans.
+    """
+
+    def __init__(
+        self,
+        anchors=PRODUCT_ANCHORS,
+        exclusions=EXCLUSION_KEYWORDS,
+        attributes=ATTRIBUTE_WORDS,
+        end_signals=END_SIGNALS,
+        price_pattern=PRICE_PATTERN,
+        label=LABEL,
+    ):
+        self.anchors = tuple(anchors)
+        self.exclusions = frozenset(exclusions)
+        self.attributes = frozenset(attributes)
+        self.end_signals = tuple(end_signals)
+        self.label = label
+        self.matcher = (
+            ANCHOR_MATCHER if anchors is PRODUCT_ANCHORS else AnchorMatcher(anchors)
+        )
+        self.price_pattern = re.compile(price_pattern, re.IGNORECASE)
+        # Сигналы ищем в уже приведенном к нижнему регистру окне
+        self.end_signal_pattern = re.compile(
+            "|".join(re.escape(signal) for signal in self.end_signals)
+        )
+
+    def fingerprint(self):
+        """Отпечаток правил: меняется при любом изменении списков, regex или метки."""
+        rules = {
+            "version": HEURISTICS_VERSION,
+            "label": self.label,
+            "anchors": sorted(self.anchors),
+            "exclusions": sorted(self.exclusions),
+            "attributes": sorted(self.attributes),
+            "end_signals": list(self.end_signals),
+            "price_pattern": self.price_pattern.pattern,
+        }
+        encoded = json.dumps(rules, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+
+DEFAULT_RULES = AnnotationRules()
+
+
+# --- Кэш разметки ---
+
+
+class AnnotationCache:
+    """
+    Кэш разметки в SQLite: ключ - хэш текста записи, значение - список сущностей.
+    Записи, посчитанные с другим отпечатком правил, удаляются при открытии.
+    """
+
+    def __init__(self, filepath, fingerprint=None):
+        self.fingerprint = fingerprint or DEFAULT_RULES.fingerprint()
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS annotations ("
+            "text_hash TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, entities TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "DELETE FROM annotations WHERE fingerprint != ?", (self.fingerprint,)
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Возвращает {хэш_текста: сущности} для найденных в кэше текстов."""
+        hashes = list({self.text_hash(text) for text in texts})
+        found = {}
+        # Ограничение SQLite на число параметров в запросе
+        for i in range(0, len(hashes), 500):
+            part = hashes[i : i + 500]
+            rows = self.connection.execute(
+                "SELECT text_hash, entities FROM annotations "
+                f"WHERE fingerprint = ? AND text_hash IN ({','.join('?' * len(part))})",
+                [self.fingerprint, *part],
+            )
+            for text_hash, entities in rows:
+                found[text_hash] = json.loads(entities)
+        return found
+
+    def put_many(self, items):
+        """Сохраняет пары (текст, сущности)."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO annotations (text_hash, fingerprint, entities) "
+            "VALUES (?, ?, ?)",
+            [
+                (self.text_hash(text), self.fingerprint, json.dumps(entities))
+                for text, entities in items
+            ],
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
 
 # --- Функции ---
 
@@ -780,89 +1048,95 @@ def load_data(filepath):
 
 
 def save_data(filepath, data):
-    """Сохраняет данные в JSON файл."""
+    """Сохраняет данные в JSON файл (.jsonl - по записи в строке)."""
     try:
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            if filepath.endswith(".jsonl"):
+                for record in data:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
         print(f"Данные успешно сохранены в '{filepath}'")
     except Exception as e:
         print(f"Произошла ошибка при сохранении файла '{filepath}': {e}")
 
 
-def get_potential_spans(text, anchors, exclusions):
-    """Находит потенциальные полные названия продуктов."""
+def get_potential_spans(text, anchors, exclusions, rules=None):
+    """
+    Находит потенциальные полные названия продуктов.
+    rules - скомпилированный AnnotationRules; если передан, anchors и
+    exclusions берутся из него.
+    """
+    if rules is None:
+        if anchors is PRODUCT_ANCHORS and exclusions is EXCLUSION_KEYWORDS:
+            rules = DEFAULT_RULES
+        else:
+            rules = AnnotationRules(anchors, exclusions)
+    exclusions = rules.exclusions
     potential_entities = []
     text_lower = text.lower()
 
     # Разделим текст на строки для контекстного анализа
-    lines = text.split("\n")
-    line_starts = [0] * len(lines)
-    current_pos = 0
-    for i, line in enumerate(lines):
-        line_starts[i] = current_pos
-        current_pos += len(line) + 1  # +1 за '\n'
-
-    # Ищем якоря
-    anchor_matches = []
-    for anchor in anchors:
-        anchor_lower = anchor.lower()
-        try:
-            # Ищем якорь как отдельное слово
-            pattern = r"\b" + re.escape(anchor_lower) + r"\b"
-            for match in re.finditer(pattern, text_lower):
-                anchor_matches.append(
-                    {"start": match.start(), "end": match.end(), "keyword": anchor}
-                )
-        except re.error as e:
-            print(f"Ошибка regex для якоря '{anchor}': {e}")
-            continue
+    line_starts = array("l", [0])
+    for newline in re.finditer("\n", text):
+        line_starts.append(newline.end())
+
+    # Индекс слов (начала и концы), строится один раз на запись
+    word_starts = array("l")
+    word_ends = array("l")
+    for word_match in WORD_PATTERN.finditer(text):
+        word_starts.append(word_match.start())
+        word_ends.append(word_match.end())
+
+    # Ищем якоря одним проходом автомата
+    anchor_matches = rules.matcher.find_all(text_lower)
 
     if not anchor_matches:
         return []
 
-    # Сортируем якоря по позиции
-    anchor_matches.sort(key=lambda x: x["start"])
-
     # Пытаемся найти полные названия вокруг якорей
-    processed_spans = set()
+    # Обработанные спаны: куча по началу + максимальный конец среди тех,
+    # что начинаются не позже текущего якоря (якоря идут по возрастанию начала)
+    processed_spans = []
+    processed_reach = -1
+    # Кандидаты, отсортированные по началу, для поиска перекрытий через bisect
+    entity_starts = []
+    entity_spans = []
+    max_entity_len = 0
 
     for match in anchor_matches:
         start, end = match["start"], match["end"]
 
         # Пропускаем, если этот якорь уже часть обработанного спана
-        if any(
-            start >= ps_start and end <= ps_end for ps_start, ps_end in processed_spans
-        ):
+        while processed_spans and processed_spans[0][0] <= start:
+            processed_reach = max(processed_reach, heapq.heappop(processed_spans)[1])
+        if end <= processed_reach:
             continue
 
         # --- Эвристика для поиска границ ---
 
         # Ищем начало строки, в которой найден якорь
-        line_index = -1
-        for i in range(len(line_starts)):
-            if start >= line_starts[i]:
-                line_index = i
-            else:
-                break
+        line_index = bisect.bisect_right(line_starts, start) - 1
 
-        current_line_start = line_starts[line_index] if line_index != -1 else 0
+        current_line_start = line_starts[line_index]
         current_line_end = (
             line_starts[line_index + 1] - 1
-            if line_index < len(lines) - 1
+            if line_index < len(line_starts) - 1
             else len(text)
         )
-        current_line = text[current_line_start:current_line_end].strip()
 
         # Потенциальное Начало: Ищем назад от якоря до начала строки или стоп-слова/пунктуации
         potential_start = start
+        # Ближайшее слово слева от якоря; дальше идем по индексу слов
+        word_index = bisect.bisect_left(word_starts, potential_start) - 1
         while potential_start > current_line_start:
-            char_before = text[potential_start - 1]
-            # Ищем первое слово слева
-            match_word_before = list(re.finditer(r"\b\w+\b", text[:potential_start]))
-            if not match_word_before:
+            if word_index < 0:
                 break  # Нет слов слева в строке
 
-            last_word_span = match_word_before[-1].span()
+            last_word_span = (
+                word_starts[word_index],
+                min(word_ends[word_index], potential_start),
+            )
             last_word = text[last_word_span[0] : last_word_span[1]]
 
             # Условия остановки поиска НАЗАД:
@@ -877,6 +1151,7 @@ def get_potential_spans(text, anchors, exclusions):
 
             # Если слово подходит, сдвигаем начало
             potential_start = last_word_span[0]
+            word_index -= 1
             # Пропускаем пробелы перед словом
             while (
                 potential_start > current_line_start
@@ -886,35 +1161,22 @@ def get_potential_spans(text, anchors, exclusions):
 
         # Потенциальный Конец: Ищем вперед от якоря до конца строки или стоп-слова/цены/пунктуации
         potential_end = end
+        # Ближайшее слово справа от якоря; дальше идем по индексу слов
+        word_index = bisect.bisect_right(word_ends, potential_end)
         while potential_end < current_line_end:
-            char_after = text[potential_end] if potential_end < len(text) else ""
-            # Ищем первое слово справа
-            match_word_after = re.search(r"\b\w+\b", text[potential_end:])
-            if not match_word_after:
+            if word_index >= len(word_ends):
                 break  # Нет слов справа
 
-            next_word_span_rel = match_word_after.span()
             next_word_span_abs = (
-                potential_end + next_word_span_rel[0],
-                potential_end + next_word_span_rel[1],
+                max(word_starts[word_index], potential_end),
+                word_ends[word_index],
             )
+            word_index += 1
             next_word = text[next_word_span_abs[0] : next_word_span_abs[1]]
 
             # Ищем признаки цены или кнопки "Add to Cart" после слова
-            text_after_word = text[
-                next_word_span_abs[1] : min(next_word_span_abs[1] + 30, len(text))
-            ]  # Смотрим немного вперед
-            price_pattern = r"(\$|€|£|₹|kr|rm|php|zar|sgd|aud|cad|nzd)\s?[\d,.]+"
-            # Добавим "add to cart", "view product", "choose options" как сигналы конца
-            end_signals = [
-                "add to cart",
-                "view product",
-                "choose options",
-                "regular price",
-                "sale price",
-                "unit price",
-                "save",
-            ]
+            # (смотрим немного вперед, не копируя текст для поиска цены)
+            look_ahead_end = min(next_word_span_abs[1] + LOOK_AHEAD_CHARS, len(text))
 
             # Условия остановки поиска ВПЕРЕД:
             # 1. Слово является исключением ИЛИ начинается с маленькой буквы (и не число/размер типа king/queen)
@@ -926,35 +1188,16 @@ def get_potential_spans(text, anchors, exclusions):
                 or (
                     next_word[0].islower()
                     and not next_word.isdigit()
-                    and next_word.lower()
-                    not in [
-                        "king",
-                        "queen",
-                        "single",
-                        "double",
-                        "black",
-                        "white",
-                        "grey",
-                        "blue",
-                        "red",
-                        "green",
-                        "brown",
-                        "ash",
-                        "oak",
-                        "walnut",
-                        "metal",
-                        "leather",
-                        "fabric",
-                        "timber",
-                        "rattan",
-                    ]
+                    and next_word.lower() not in rules.attributes
                 )  # Разрешаем некоторые атрибуты
-                or re.search(price_pattern, text_after_word, re.IGNORECASE)
-                or any(signal in text_after_word.lower() for signal in end_signals)
-                or "\n\n"
-                in text[
-                    potential_end : next_word_span_abs[0] + 1
-                ]  # Два переноса строки
+                or rules.price_pattern.search(
+                    text, next_word_span_abs[1], look_ahead_end
+                )
+                or rules.end_signal_pattern.search(
+                    text[next_word_span_abs[1] : look_ahead_end].lower()
+                )
+                or text.find("\n\n", potential_end, next_word_span_abs[0] + 1)
+                != -1  # Два переноса строки
             ):
                 break
 
@@ -968,10 +1211,10 @@ def get_potential_spans(text, anchors, exclusions):
         final_text = text[final_start:final_end].strip()
 
         # Удаляем висячие знаки препинания в начале/конце
-        while final_text and final_text[0] in string.punctuation + " ":
+        while final_text and final_text[0] in STRIP_CHARS:
             final_text = final_text[1:]
             final_start += 1
-        while final_text and final_text[-1] in string.punctuation + " ":
+        while final_text and final_text[-1] in STRIP_CHARS:
             final_text = final_text[:-1]
             final_end -= 1
 
@@ -995,16 +1238,21 @@ def get_potential_spans(text, anchors, exclusions):
         if final_text.lower() in exclusions:
             is_valid = False
         if final_text.isdigit() or all(
-            c in string.punctuation + " " for c in final_text
+            c in STRIP_CHARS for c in final_text
         ):
             is_valid = False
-        if not re.search(r"[a-zA-Z]", final_text):
+        if not LATIN_LETTER_PATTERN.search(final_text):
             is_valid = False
 
         # Проверка на перекрытие перед добавлением
+        # Смотрим только кандидатов, начинающихся до конца нового спана и
+        # не дальше самой длинной сущности от его начала
         overlapped = False
-        for ps_start, ps_end, _ in potential_entities:
-            if max(final_start, ps_start) < min(final_end, ps_end):
+        i = bisect.bisect_left(entity_starts, final_end) - 1
+        while is_valid and i >= 0 and entity_starts[i] + max_entity_len > final_start:
+            ps_start, ps_end = entity_spans[i]
+            i -= 1
+            if ps_end > final_start:
                 # Если новая сущность длиннее, она может заменить старую
                 if (final_end - final_start) > (ps_end - ps_start):
                     continue  # Позволим добавить, разберемся на следующем шаге
@@ -1016,7 +1264,11 @@ def get_potential_spans(text, anchors, exclusions):
             potential_entities.append(
                 [final_start, final_end, final_text]
             )  # Сохраняем текст для разрешения конфликтов
-            processed_spans.add(final_span)
+            heapq.heappush(processed_spans, final_span)
+            i = bisect.bisect_right(entity_starts, final_start)
+            entity_starts.insert(i, final_start)
+            entity_spans.insert(i, final_span)
+            max_entity_len = max(max_entity_len, final_end - final_start)
 
     # --- Разрешение конфликтов перекрытий (приоритет длинным) ---
     if not potential_entities:
@@ -1026,11 +1278,13 @@ def get_potential_spans(text, anchors, exclusions):
     potential_entities.sort(key=lambda x: (x[0], -(x[1] - x[0])))
 
     final_entities = []
-    covered_indices = set()
+    # Принятые сущности не пересекаются и идут по началу, поэтому занятая
+    # область слева - это всё до конца последней принятой
+    covered_end = -1
 
     for start, end, ent_text in potential_entities:
         # Проверяем, не перекрывается ли *значительно* с уже добавленными
-        if any(i in covered_indices for i in range(start, end)):
+        if start < covered_end:
             continue  # Пропускаем, если уже занято
 
         # Проверяем, не является ли сущность просто одним словом-исключением
@@ -1038,8 +1292,8 @@ def get_potential_spans(text, anchors, exclusions):
         if ent_text.lower() in exclusions and len(ent_text.split()) == 1:
             continue
 
-        final_entities.append([start, end, LABEL])
-        covered_indices.update(range(start, end))
+        final_entities.append([start, end, rules.label])
+        covered_end = end
 
     # Сортируем по начальной позиции для spaCy
     final_entities.sort(key=lambda x: x[0])
@@ -1047,8 +1301,165 @@ def get_potential_spans(text, anchors, exclusions):
     return final_entities
 
 
+def annotate_record(record):
+    """
+    Размечает одну запись. Возвращает {"text", "entities"} (список сущностей
+    может быть пустым) или None, если в записи нет текста.
+    """
+    text = record.get("text") if isinstance(record, dict) else None
+    if not text or not isinstance(text, str):
+        return None
+
+    entities = get_potential_spans(
+        text, PRODUCT_ANCHORS, EXCLUSION_KEYWORDS, DEFAULT_RULES
+    )
+    return {"text": text, "entities": entities}
+
+
+def iter_jsonl(f, filepath):
+    """Построчно читает открытый JSON Lines файл, не загружая его целиком."""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            print(f"Ошибка: Не удалось декодировать строку {line_number} в '{filepath}'.")
+
+
+def annotate_records(records, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+    """
+    Размечает поток записей, сохраняя их порядок.
+    При workers > 1 записи раздаются пачками по chunk_size в пул процессов.
+    С cache заново размечаются только тексты, которых нет в кэше.
+    """
+    if cache is None:
+        if workers <= 1:
+            yield from map(annotate_record, records)
+            return
+
+        with multiprocessing.Pool(processes=workers) as pool:
+            yield from pool.imap(annotate_record, records, chunksize=chunk_size)
+        return
+
+    pool = multiprocessing.Pool(processes=workers) if workers > 1 else None
+    try:
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, CACHE_BATCH_SIZE))
+            if not batch:
+                break
+            yield from _annotate_batch_with_cache(batch, pool, chunk_size, cache)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def _annotate_batch_with_cache(batch, pool, chunk_size, cache):
+    texts = [
+        record.get("text") if isinstance(record, dict) else None for record in batch
+    ]
+    texts = [text if text and isinstance(text, str) else None for text in texts]
+    cached = cache.get_many([text for text in texts if text])
+
+    results = [None] * len(batch)
+    missing = []
+    for i, text in enumerate(texts):
+        if text is None:
+            continue
+        entities = cached.get(cache.text_hash(text))
+        if entities is None:
+            missing.append(i)
+        else:
+            results[i] = {"text": text, "entities": entities}
+    cache.hits += len(batch) - len(missing) - texts.count(None)
+    cache.misses += len(missing)
+
+    if missing:
+        missing_records = [batch[i] for i in missing]
+        if pool is None:
+            computed = list(map(annotate_record, missing_records))
+        else:
+            computed = pool.map(annotate_record, missing_records, chunksize=chunk_size)
+        for i, result in zip(missing, computed):
+            results[i] = result
+        cache.put_many((result["text"], result["entities"]) for result in computed)
+
+    return results
+
+
+def annotate_jsonl(
+    input_path, output_path, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None
+):
+    """
+    Потоково размечает JSON Lines файл и пишет результат построчно.
+    Возвращает (число_размеченных, число_без_сущностей).
+    """
+    annotated_count = 0
+    not_found_count = 0
+    # Вход открываем первым: если его нет, старый вывод не должен обнулиться
+    with open(input_path, "r", encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as out:
+        results = annotate_records(iter_jsonl(source, input_path), workers, chunk_size, cache)
+        for i, result in enumerate(results):
+            if result is None:
+                continue
+            if result["entities"]:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                annotated_count += 1
+            else:
+                not_found_count += 1
+
+            if (i + 1) % PROGRESS_EVERY == 0:
+                out.flush()
+                print(f"Обработано {i + 1} записей...")
+    return annotated_count, not_found_count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=f"Автоматическая разметка сущностей '{LABEL}' по якорям."
+    )
+    parser.add_argument("--input", default=INPUT_JSON_FILE, help="JSON или JSON Lines (.jsonl) файл")
+    parser.add_argument("--output", default=OUTPUT_JSON_FILE, help="JSON или JSON Lines (.jsonl) файл")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов разметки")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Записей на одну задачу процесса")
+    parser.add_argument("--cache", default=ANNOTATION_CACHE_FILE, help="SQLite файл кэша разметки")
+    parser.add_argument("--no-cache", action="store_true", help="Размечать все записи заново")
+    return parser.parse_args(argv)
+
+
 # --- Основной код ---
 if __name__ == "__main__":
+    args = parse_args()
+    INPUT_JSON_FILE = args.input
+    OUTPUT_JSON_FILE = args.output
+    cache = None if args.no_cache else AnnotationCache(args.cache)
+
+    # JSON Lines: потоковая обработка без загрузки всего файла в память
+    if INPUT_JSON_FILE.endswith(".jsonl"):
+        if not OUTPUT_JSON_FILE.endswith(".jsonl"):
+            OUTPUT_JSON_FILE = os.path.splitext(OUTPUT_JSON_FILE)[0] + ".jsonl"
+        print(
+            f"Потоковая обработка '{INPUT_JSON_FILE}' для метки '{LABEL}' "
+            f"({args.workers} процесс(ов), пачки по {args.chunk_size})..."
+        )
+        try:
+            annotated_count, not_found_count = annotate_jsonl(
+                INPUT_JSON_FILE, OUTPUT_JSON_FILE, args.workers, args.chunk_size, cache
+            )
+        except FileNotFoundError:
+            print(f"Ошибка: Файл '{INPUT_JSON_FILE}' не найден.")
+            raise SystemExit(1)
+        print(f"Обработка завершена.")
+        print(f"Найдено потенциальных сущностей '{LABEL}' в {annotated_count} записях.")
+        print(f"Не найдено сущностей в {not_found_count} записях.")
+        if cache:
+            print(f"Из кэша: {cache.hits}, размечено заново: {cache.misses}.")
+            cache.close()
+        print(f"Данные успешно сохранены в '{OUTPUT_JSON_FILE}'")
+        raise SystemExit(0)
+
     # Создаем dummy input_data.json, если его нет, для тестирования
     if not os.path.exists(INPUT_JSON_FILE):
         print(f"Файл {INPUT_JSON_FILE} не найден. Создаю пример файла для теста.")
@@ -1077,19 +1488,19 @@ if __name__ == "__main__":
         )
         not_found_count = 0
 
-        for i, record in enumerate(input_records):
-            text = record.get("text")
-            if not text or not isinstance(text, str):
+        results = annotate_records(
+            input_records, args.workers, args.chunk_size, cache
+        )
+        for i, result in enumerate(results):
+            if result is None:
                 continue
 
-            entities = get_potential_spans(text, PRODUCT_ANCHORS, EXCLUSION_KEYWORDS)
-
-            if entities:
-                spacy_training_data.append({"text": text, "entities": entities})
+            if result["entities"]:
+                spacy_training_data.append(result)
             else:
                 not_found_count += 1
 
-            if (i + 1) % 50 == 0:  # Выводим прогресс каждые 50 записей
+            if (i + 1) % PROGRESS_EVERY == 0:
                 print(f"Обработано {i + 1}/{len(input_records)} записей...")
 
         print(f"Обработка завершена.")
@@ -1097,6 +1508,9 @@ if __name__ == "__main__":
             f"Найдено потенциальных сущностей '{LABEL}' в {len(spacy_training_data)} записях."
         )
         print(f"Не найдено сущностей в {not_found_count} записях.")
+        if cache:
+            print(f"Из кэша: {cache.hits}, размечено заново: {cache.misses}.")
+            cache.close()
 
         save_data(OUTPUT_JSON_FILE, spacy_training_data)
 
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ExtractionJob
+
+
+@admin.register(ExtractionJob)
+class ExtractionJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'url', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('url',)
@@ -1,30 +1,84 @@
 from django.apps import AppConfig
 from django.conf import settings
-import spacy
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Короткий текст для прогрева: первый вызов модели выделяет буферы и кэши
+WARMUP_TEXT = "Hamar Oak Dining Table - Regular price $515"
+
 
 class ExtractorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'extractor'
     nlp_model = None
+    _model_load_attempted = False
+    _model_lock = threading.Lock()
 
     def ready(self):
         """
         Этот метод вызывается Django, когда приложение готово.
-        Идеальное место для загрузки модели.
+        Модель здесь не загружается: ready() выполняется и для migrate,
+        collectstatic, shell и тестов. Модель грузится при первом обращении
+        через get_nlp_model() или заранее через warmup() (wsgi.py, воркер очереди).
+        """
+        logging.basicConfig(level=logging.INFO)
+
+    def get_nlp_model(self):
+        """
+        Возвращает spaCy модель, загружая ее при первом вызове. Потокобезопасно:
+        параллельные запросы ждут одной загрузки. Если загрузка не удалась,
+        повторно не пытаемся и возвращаем None.
         """
-        if not self.nlp_model:  # Загружаем только если еще не загружена
-            model_path = settings.SPACY_MODEL_PATH
+        if self.nlp_model is None and not self._model_load_attempted:
+            with self._model_lock:
+                if self.nlp_model is None and not self._model_load_attempted:
+                    self.nlp_model = self._load_model()
+                    self._model_load_attempted = True
+        return self.nlp_model
+
+    def warmup(self):
+        """Загружает модель и прогоняет через нее короткий текст."""
+        nlp = self.get_nlp_model()
+        if nlp is not None:
             try:
-                logger.info(f"Loading spaCy model from: {model_path}")
-                self.nlp_model = spacy.load(model_path)
-                logger.info("spaCy model loaded successfully.")
-            except OSError as e:
-                logger.error(f"Error loading spaCy model from {model_path}: {e}", exc_info=True)
+                nlp(WARMUP_TEXT)
+                logger.info("NER model warmed up.")
             except Exception as e:
-                logger.error(f"Unexpected error loading spaCy model: {e}", exc_info=True)
+                logger.error(f"Error warming up NER model: {e}", exc_info=True)
+        return nlp
 
-        logging.basicConfig(level=logging.INFO)
+    def _load_model(self):
+        if settings.NER_BACKEND == 'numpy':
+            return self._load_numpy_model()
+        # spaCy импортируем здесь же: сам импорт занимает около секунды
+        import spacy
+
+        model_path = settings.SPACY_MODEL_PATH
+        try:
+            logger.info(f"Loading spaCy model from: {model_path}")
+            nlp = spacy.load(model_path)
+            logger.info("spaCy model loaded successfully.")
+            return nlp
+        except OSError as e:
+            logger.error(f"Error loading spaCy model from {model_path}: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"Unexpected error loading spaCy model: {e}", exc_info=True)
+        return None
+
+    def _load_numpy_model(self):
+        """Экспорт модели для extractor.numpy_ner: тот же интерфейс nlp(text) / nlp.pipe(), но без spaCy."""
+        from .numpy_ner import load
+
+        model_path = settings.NUMPY_MODEL_PATH
+        try:
+            logger.info(f"Loading NumPy NER model from: {model_path}")
+            nlp = load(model_path)
+            logger.info("NumPy NER model loaded successfully.")
+            return nlp
+        except OSError as e:
+            logger.error(f"Error loading NumPy NER model from {model_path}: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"Unexpected error loading NumPy NER model: {e}", exc_info=True)
+        return None
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+import requests
+from django.conf import settings
+
+from .http_session import RETRY_STATUSES, backoff_delay
+from .services import (
+    USER_AGENT, REQUEST_TIMEOUT, extract_text_from_html, extract_products_with_ner, get_http_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# Клиент и семафор привязаны к event loop, поэтому храним их по циклу;
+# записи закрытых и собранных циклов удаляются сами
+_clients = weakref.WeakKeyDictionary()
+_fetch_limits = weakref.WeakKeyDictionary()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Ограниченный пул потоков для CPU-работы (разбор HTML и spaCy) вне event loop."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_INFERENCE_WORKERS, thread_name_prefix='inference'
+                )
+    return _executor
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={'User-Agent': USER_AGENT},
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.ASYNC_MAX_FETCHES,
+            max_keepalive_connections=settings.HTTP_POOL_MAXSIZE * settings.HTTP_POOL_CONNECTIONS,
+        ),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Общий для event loop асинхронный HTTP-клиент с пулом keep-alive соединений.
+    Только для долгоживущего цикла ASGI-сервера: клиент не закрывается.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_async_client()
+        _clients[loop] = client
+        _fetch_limits[loop] = asyncio.Semaphore(settings.ASYNC_MAX_FETCHES)
+    return client
+
+
+async def _get_with_retries(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+    """
+    GET с той же политикой повторов, что у requests-сессии (http_session.build_session):
+    сетевые ошибки и 429/5xx повторяются до HTTP_MAX_RETRIES раз, Retry-After не
+    учитывается, после последней попытки возвращается сам ответ.
+    """
+    max_retries = settings.HTTP_MAX_RETRIES
+    for retry_number in range(max_retries + 1):
+        if retry_number:
+            await asyncio.sleep(backoff_delay(retry_number, settings.HTTP_RETRY_BACKOFF))
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.TransportError:
+            if retry_number == max_retries:
+                raise
+            continue
+        if response.status_code not in RETRY_STATUSES or retry_number == max_retries:
+            return response
+
+
+async def _fetch_from_network(url: str, headers: Dict[str, str], shared_client: bool) -> httpx.Response:
+    if shared_client:
+        client = get_async_client()
+        async with _fetch_limits[asyncio.get_running_loop()]:
+            return await _get_with_retries(client, url, headers)
+    # Под WSGI async_to_sync создает новый цикл на каждый запрос: общий клиент
+    # остался бы открытым после него, поэтому клиент живет один вызов
+    async with _build_async_client() as client:
+        return await _get_with_retries(client, url, headers)
+
+
+async def _fetch(url: str, shared_client: bool) -> Union[httpx.Response, requests.Response]:
+    """
+    Скачивает URL через тот же HTTP-кэш, что и синхронный путь (HTTPCache.prepare /
+    complete; SQLite - в пуле потоков по умолчанию, не в event loop). Из кэша
+    приходит requests.Response со статусом 200: headers и text у него те же.
+    """
+    http_cache = get_http_cache()
+    if http_cache is None:
+        return await _fetch_from_network(url, {}, shared_client)
+
+    loop = asyncio.get_running_loop()
+    cached, headers = await loop.run_in_executor(None, http_cache.prepare, url)
+    if cached is not None:
+        return cached
+    response = await _fetch_from_network(url, headers, shared_client)
+    revalidated = await loop.run_in_executor(None, partial(
+        http_cache.complete, url, response.status_code, response.headers,
+        response.charset_encoding, response.content,
+    ))
+    return revalidated if revalidated is not None else response
+
+
+async def ascrape_and_extract_text(url: str, shared_client: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Асинхронный вариант scrape_and_extract_text: скачивание через httpx (с HTTP-кэшем
+    и повторами, как у синхронного), разбор HTML - в пуле потоков.
+    Возвращает (текст, сообщение_об_ошибке).
+    shared_client - брать общий клиент цикла (get_async_client), только под ASGI.
+    """
+    try:
+        response = await _fetch(url, shared_client)
+        response.raise_for_status()
+
+        content_type = response.headers.get('content-type', '').lower()
+        if 'html' not in content_type:
+            logger.warning(f"Content-Type is not HTML for {url}: {content_type}")
+            return None, f"URL content type is not HTML ({content_type})."
+
+        html_content = response.text
+        logger.info(f"Successfully fetched URL: {url}")
+
+        loop = asyncio.get_running_loop()
+        extracted_text = await loop.run_in_executor(get_inference_executor(), extract_text_from_html, html_content)
+        if extracted_text:
+            return extracted_text, None
+        else:
+            logger.warning(f"No meaningful text extracted from URL: {url}")
+            return None, "Could not extract meaningful text from the page."
+
+    except httpx.TimeoutException:
+        logger.warning(f"Request timed out for URL: {url}")
+        return None, "The request timed out."
+    except httpx.HTTPStatusError as e:
+        logger.warning(f"HTTP Error for URL {url}: {e.response.status_code}")
+        return None, f"Could not fetch URL (HTTP {e.response.status_code})."
+    except httpx.HTTPError as e:
+        logger.error(f"Could not fetch or process URL: {url}. Error: {e}", exc_info=True)
+        return None, f"Could not fetch URL: {e}"
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while scraping {url}: {e}", exc_info=True)
+        return None, "An unexpected error occurred during scraping."
+
+
+async def aextract_products_with_ner(text: str) -> Optional[List[str]]:
+    """Запускает NER в ограниченном пуле потоков, не блокируя event loop. None - ошибка NER."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_inference_executor(), extract_products_with_ner, text)
@@ -0,0 +1,65 @@
+import re
+from typing import Iterable, List, Tuple
+
+DEFAULT_MAX_CHUNK_CHARS = 2000
+# Перекрытие соседних кусков: название на стыке целиком попадает во второй кусок
+DEFAULT_CHUNK_OVERLAP = 200
+# Конец предложения в очищенном тексте страницы (переносов строк в нем нет)
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+\s+')
+
+Span = Tuple[int, int, str]
+
+
+def split_text(text: str, max_chars: int = DEFAULT_MAX_CHUNK_CHARS,
+               overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[Tuple[int, int]]:
+    """
+    Делит текст на куски не длиннее max_chars символов и возвращает их границы
+    (start, end). Кусок по возможности заканчивается на конце предложения во
+    второй половине окна, иначе на пробеле; следующий кусок начинается на
+    overlap символов раньше (с начала слова).
+    """
+    length = len(text)
+    if length <= max_chars:
+        return [(0, length)]
+    overlap = min(overlap, max_chars // 4)
+
+    chunks = []
+    start = 0
+    while start < length:
+        end = min(start + max_chars, length)
+        if end < length:
+            window_start = start + max_chars // 2
+            cut = -1
+            for match in SENTENCE_END_PATTERN.finditer(text, window_start, end):
+                cut = match.end()
+            if cut == -1:
+                space = text.rfind(' ', window_start, end)
+                cut = space + 1 if space != -1 else end
+            end = cut
+        chunks.append((start, end))
+        if end >= length:
+            break
+
+        next_start = end
+        if overlap:
+            space = text.find(' ', end - overlap, end)
+            if space != -1:
+                next_start = space + 1
+        start = next_start if next_start > start else end
+    return chunks
+
+
+def merge_spans(spans: Iterable[Span]) -> List[Span]:
+    """
+    Объединяет сущности из перекрывающихся кусков (смещения - в исходном тексте).
+    Одинаковые спаны схлопываются, из пересекающихся остается более длинный:
+    у края куска модель видит название обрезанным.
+    """
+    merged: List[Span] = []
+    for span in sorted(set(spans), key=lambda s: (s[0], -(s[1] - s[0]))):
+        if merged and span[0] < merged[-1][1]:
+            if span[1] - span[0] > merged[-1][1] - merged[-1][0]:
+                merged[-1] = span
+            continue
+        merged.append(span)
+    return merged
@@ -0,0 +1,40 @@
+import json
+from typing import Iterator, List, Set, Tuple
+
+
+def iter_records(filepath: str) -> Iterator[dict]:
+    """Записи из JSON Lines (.jsonl, построчно) или из JSON-списка."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if filepath.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def read_docs(path: str, vocab) -> Iterator:
+    """Документы из .spacy файла или каталога шардов (как у spacy.Corpus)."""
+    # spaCy импортируем здесь же: остальному модулю он не нужен, а импорт занимает около секунды
+    from spacy.tokens import DocBin
+    from spacy.training.corpus import walk_corpus
+
+    for filepath in walk_corpus(path, '.spacy'):
+        yield from DocBin().from_disk(filepath).get_docs(vocab)
+
+
+def load_texts(filepath: str) -> List[str]:
+    """Непустые поля "text" записей файла (.jsonl или .json)."""
+    return [
+        record['text'] for record in iter_records(filepath)
+        if isinstance(record, dict) and isinstance(record.get('text'), str) and record['text']
+    ]
+
+
+def prf(predicted: Set, gold: Set) -> Tuple[float, float, float]:
+    """Precision, recall и F1 множества предсказанных спанов относительно эталонных."""
+    true_positives = len(predicted & gold)
+    precision = true_positives / len(predicted) if predicted else 0.0
+    recall = true_positives / len(gold) if gold else 0.0
+    f_score = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f_score
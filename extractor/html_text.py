@@ -0,0 +1,191 @@
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # lxml необязателен: без него работает только бэкенд bs4
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+# Теги, которые выбрасываются вместе с содержимым
+EXCLUDED_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'link', 'meta')
+# Строки внутри этих тегов BeautifulSoup хранит особыми типами (TemplateString,
+# RubyTextString, ...) и не включает в get_text() - повторяем это в lxml
+NON_TEXT_TAGS = ('template', 'rt', 'rp')
+# Селекторы основного блока страницы в порядке приоритета. Поддерживаются
+# простые селекторы: tag, #id, .class и их сочетания (div.content, div#main)
+DEFAULT_CONTENT_SELECTORS = ('main', 'article', '#content', '#main-content', '.content', '.main', '.product-details')
+DEFAULT_MAX_HTML_BYTES = 3 * 1024 * 1024
+MIN_TEXT_LENGTH = 50
+BODY_TAG_PATTERN = re.compile(r'<body[\s/>]', re.IGNORECASE)
+SIMPLE_SELECTOR_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:[#.][\w-]+)*)$')
+
+HtmlTextExtractor = Callable[..., Optional[str]]
+
+
+def truncate_html(html_content: str, max_bytes: Optional[int]) -> str:
+    """Обрезает HTML до max_bytes байт в UTF-8 (по границе символа)."""
+    if not max_bytes or len(html_content) * 4 <= max_bytes:
+        return html_content
+    encoded = html_content.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return html_content
+    logger.warning(f"HTML is {len(encoded)} bytes, truncating to {max_bytes} before parsing.")
+    return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+
+def _clean_text(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def extract_text_bs4(html_content: str, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS) -> Optional[str]:
+    """Извлекает основной текст из HTML через BeautifulSoup (html.parser)."""
+    if not html_content:
+        return None
+    try:
+        soup = BeautifulSoup(html_content, 'html.parser')
+        for tag in soup(list(EXCLUDED_TAGS)):
+            tag.decompose()
+
+        main_content = None
+        for selector in selectors:
+            main_content = soup.select_one(selector)
+            if main_content:
+                break
+        if not main_content:
+            main_content = soup.body
+
+        if main_content:
+            cleaned_text = _clean_text(main_content.get_text(separator=' ', strip=True))
+            if len(cleaned_text) > MIN_TEXT_LENGTH:
+                return cleaned_text
+            logger.warning("Extracted text seems too short, falling back to full page text.")
+            cleaned_full_text = _clean_text(soup.get_text(separator=' ', strip=True))
+            return cleaned_full_text if len(cleaned_full_text) > MIN_TEXT_LENGTH else None
+        else:
+            logger.warning("Could not find main content or body tag.")
+            return None
+    except Exception as e:
+        logger.error(f"Error parsing HTML: {e}", exc_info=True)
+        return None
+
+
+_parsers = threading.local()
+
+
+def _html_parser():
+    # Парсер lxml нельзя использовать из нескольких потоков одновременно
+    parser = getattr(_parsers, 'parser', None)
+    if parser is None:
+        parser = etree.HTMLParser(encoding='utf-8', huge_tree=True)
+        _parsers.parser = parser
+    return parser
+
+
+@lru_cache(maxsize=64)
+def _selector_xpath(selector: str):
+    """Переводит простой CSS-селектор в XPath, отбирающий первый подходящий элемент."""
+    match = SIMPLE_SELECTOR_PATTERN.match(selector.strip())
+    if not match or not selector.strip():
+        raise ValueError(f"Unsupported content selector '{selector}': use tag, #id, .class or their combination")
+    tag, qualifiers = match.groups()
+    # Очищенные теги остаются в дереве пустыми - их не выбираем
+    conditions = [f"not(self::{excluded})" for excluded in EXCLUDED_TAGS]
+    for qualifier in re.findall(r'[#.][\w-]+', qualifiers):
+        if qualifier[0] == '#':
+            conditions.append(f"@id='{qualifier[1:]}'")
+        else:
+            # Класс - одно из слов атрибута class, как в CSS
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {qualifier[1:]} ')")
+    return etree.XPath(f"(//{tag.lower() if tag else '*'}[{' and '.join(conditions)}])[1]")
+
+
+def _drop_elements(root, tags):
+    """
+    Очищает элементы вместе с содержимым, но оставляет хвостовой текст после них
+    отдельной строкой - как decompose() в BeautifulSoup.
+    """
+    for element in list(root.iter(*tags)):
+        element.clear(keep_tail=True)
+
+
+def _element_text(element) -> str:
+    if any(ancestor.tag in NON_TEXT_TAGS for ancestor in element.iterancestors()):
+        return ''
+    return _clean_text(' '.join(element.itertext()))
+
+
+def extract_text_lxml(html_content: str, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS) -> Optional[str]:
+    """
+    То же, что extract_text_bs4, но разбор в lxml (libxml2), а ненужные теги
+    очищаются на уже разобранном дереве без обхода из Python.
+    На тех же страницах дает тот же текст.
+    """
+    if not html_content:
+        return None
+    xpaths = [_selector_xpath(selector) for selector in selectors]
+    try:
+        root = etree.fromstring(html_content.encode('utf-8'), _html_parser())
+        if root is None:
+            return None
+        _drop_elements(root, EXCLUDED_TAGS)
+
+        main_content = None
+        for xpath in xpaths:
+            matches = xpath(root)
+            if matches:
+                main_content = matches[0]
+                break
+        if main_content is None and BODY_TAG_PATTERN.search(html_content):
+            # lxml достраивает <body> всегда, html.parser - только если тег есть в разметке
+            main_content = root.find('body')
+
+        if main_content is not None:
+            _drop_elements(root, NON_TEXT_TAGS)
+            cleaned_text = _element_text(main_content)
+            if len(cleaned_text) > MIN_TEXT_LENGTH:
+                return cleaned_text
+            logger.warning("Extracted text seems too short, falling back to full page text.")
+            cleaned_full_text = _element_text(root)
+            return cleaned_full_text if len(cleaned_full_text) > MIN_TEXT_LENGTH else None
+        else:
+            logger.warning("Could not find main content or body tag.")
+            return None
+    except Exception as e:
+        logger.warning(f"lxml could not parse HTML, falling back to BeautifulSoup: {e}")
+        return extract_text_bs4(html_content, selectors)
+
+
+BACKENDS: Dict[str, HtmlTextExtractor] = {'bs4': extract_text_bs4}
+if etree is not None:
+    BACKENDS['lxml'] = extract_text_lxml
+
+
+def get_backend(name: str = 'auto') -> HtmlTextExtractor:
+    """Бэкенд по имени ('lxml', 'bs4'); 'auto' - lxml, если он установлен."""
+    if name == 'auto':
+        name = 'lxml' if 'lxml' in BACKENDS else 'bs4'
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown HTML text backend '{name}', available: {', '.join(BACKENDS)}")
+
+
+def extract_text(html_content: str, backend: str = 'auto',
+                 selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS,
+                 max_bytes: Optional[int] = DEFAULT_MAX_HTML_BYTES) -> Optional[str]:
+    """
+    Основной текст страницы. Общий для сервиса и scripts/scraper.py, чтобы на
+    инференсе модель видела такой же текст, как при обучении.
+    HTML обрезается до max_bytes, основной блок ищется по цепочке selectors
+    (без него - <body>); если в блоке мало текста, берется текст всей страницы.
+    """
+    if not html_content:
+        return None
+    return get_backend(backend)(truncate_html(html_content, max_bytes), selectors)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB тел страниц
+DEFAULT_TTL = 24 * 60 * 60  # Сутки отдаем из кэша без обращения к сайту
+
+# Заголовки ответа, которые сохраняем вместе с телом
+STORED_HEADERS = ('content-type', 'etag', 'last-modified')
+
+
+class HTTPCache:
+    """
+    Дисковый HTTP-кэш для GET-запросов (SQLite).
+
+    Пока запись моложе ttl, страница отдается без сети. Устаревшая запись
+    проверяется условным запросом (If-None-Match / If-Modified-Since); ответ
+    304 продлевает ее. Общий размер тел ограничен max_bytes, при превышении
+    удаляются давно не использованные записи (LRU).
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Одно соединение на процесс; доступ из потоков к нему и к счетчикам - под блокировкой
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'url_hash TEXT PRIMARY KEY, url TEXT NOT NULL, headers TEXT NOT NULL, '
+                'encoding TEXT, body BLOB NOT NULL, size INTEGER NOT NULL, '
+                'stored_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)'
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None, session=None) -> requests.Response:
+        """
+        GET через кэш. Возвращает requests.Response (из кэша или из сети);
+        ошибки сети и HTTP-статусы остаются на вызывающем коде, как у requests.get.
+        """
+        cached, request_headers = self.prepare(url, headers)
+        if cached is not None:
+            return cached
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+        revalidated = self.complete(url, response.status_code, response.headers, response.encoding, response.content)
+        return revalidated if revalidated is not None else response
+
+    def prepare(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Optional[requests.Response], Dict[str, str]]:
+        """
+        Часть get до запроса в сеть, для своего HTTP-клиента (например, httpx):
+        (ответ из кэша, если запись свежая, иначе None; заголовки запроса
+        с If-None-Match / If-Modified-Since для устаревшей записи).
+        """
+        key = self._key(url)
+        entry = self._lookup(key)
+        now = time.time()
+
+        if entry and now - entry['stored_at'] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            self._touch(key, now)
+            return self._build_response(url, entry), dict(headers or {})
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry['headers'].get('etag'):
+                request_headers['If-None-Match'] = entry['headers']['etag']
+            if entry['headers'].get('last-modified'):
+                request_headers['If-Modified-Since'] = entry['headers']['last-modified']
+        return None, request_headers
+
+    def complete(self, url: str, status_code: int, headers, encoding: Optional[str],
+                 content: bytes) -> Optional[requests.Response]:
+        """
+        Часть get после ответа сети. На 304 продлевает запись и возвращает ее
+        как ответ; иначе сохраняет ответ 200 (без Cache-Control: no-store) и
+        возвращает None - вызывающий код использует ответ сети.
+        """
+        key = self._key(url)
+        entry = self._lookup(key) if status_code == 304 else None
+        if entry:
+            with self._lock:
+                self.revalidated += 1
+            entry['headers'].update(
+                {name: headers[name] for name in ('etag', 'last-modified') if name in headers}
+            )
+            self._store(key, url, entry['headers'], entry['encoding'], entry['body'])
+            return self._build_response(url, entry)
+
+        with self._lock:
+            self.misses += 1
+        cache_control = headers.get('cache-control', '').lower()
+        if status_code == 200 and 'no-store' not in cache_control:
+            stored_headers = {name: headers[name] for name in STORED_HEADERS if name in headers}
+            self._store(key, url, stored_headers, encoding, content)
+        return None
+
+    def _lookup(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT headers, encoding, body, stored_at FROM responses WHERE url_hash = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'headers': json.loads(row[0]), 'encoding': row[1], 'body': row[2], 'stored_at': row[3]}
+
+    def _touch(self, key: str, now: float):
+        with self._lock:
+            self._connection.execute('UPDATE responses SET last_access = ? WHERE url_hash = ?', (now, key))
+            self._connection.commit()
+
+    def _store(self, key: str, url: str, headers: dict, encoding: Optional[str], body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(url_hash, url, headers, encoding, body, size, stored_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, json.dumps(headers), encoding, body, len(body), now, now),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока размер больше max_bytes."""
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute('SELECT url_hash, size FROM responses ORDER BY last_access').fetchall()
+        evicted = []
+        for url_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((url_hash,))
+            total -= size
+        self._connection.executemany('DELETE FROM responses WHERE url_hash = ?', evicted)
+        logger.info(f"HTTP cache evicted {len(evicted)} entries")
+
+    @staticmethod
+    def _build_response(url: str, entry: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = entry['encoding']
+        response._content = entry['body']
+        return response
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
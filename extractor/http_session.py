@@ -0,0 +1,82 @@
+import logging
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONNECTIONS = 20  # Сколько хостов держим в пуле одновременно
+DEFAULT_POOL_MAXSIZE = 10  # Соединений keep-alive на один хост
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.5  # Паузы между повторами: 0 s, 1 s, 2 s, ... (см. backoff_delay)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                  pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                  max_retries: int = DEFAULT_MAX_RETRIES,
+                  backoff_factor: float = DEFAULT_BACKOFF_FACTOR) -> requests.Session:
+    """
+    Создает requests.Session с пулом keep-alive соединений по хостам и повтором
+    запросов при сетевых ошибках и ответах 429/5xx. Пул urllib3 потокобезопасен,
+    поэтому одну сессию можно использовать из всех потоков процесса; cookie
+    сессия не сохраняет.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        # После последней попытки отдаем сам ответ, чтобы raise_for_status
+        # вызывающего кода сработал как раньше
+        raise_on_status=False,
+        # Retry-After от чужого сайта может быть сколь угодно большим и занял бы
+        # рабочий процесс; ждем только собственный backoff
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Сессия общая для всех запросов процесса: cookie одного сайта (или ответа на
+    # запрос одного пользователя) не должны уходить в следующие запросы
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def backoff_delay(retry_number: int, backoff_factor: float) -> float:
+    """
+    Пауза перед retry_number-м повтором (с 1) - та же, что у Retry из build_session:
+    первый повтор сразу, дальше backoff_factor * 2 ** (retry_number - 1).
+    """
+    if retry_number <= 1:
+        return 0.0
+    return min(backoff_factor * 2 ** (retry_number - 1), Retry.DEFAULT_BACKOFF_MAX)
+
+
+def connection_stats(session: requests.Session) -> Dict[str, int]:
+    """
+    Метрики переиспользования соединений по всем пулам сессии:
+    число запросов, открытых соединений и запросов по уже открытым соединениям.
+    """
+    requests_count = 0
+    connections_count = 0
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        for pool_key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools.get(pool_key)
+            if pool is None:
+                continue
+            requests_count += pool.num_requests
+            connections_count += pool.num_connections
+    return {
+        'requests': requests_count,
+        'connections': connections_count,
+        'reused': max(requests_count - connections_count, 0),
+    }
@@ -0,0 +1,76 @@
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .chunking import DEFAULT_CHUNK_OVERLAP, DEFAULT_MAX_CHUNK_CHARS, merge_spans, split_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_N_PROCESS = 1
+TARGET_LABEL = 'PRODUCT'
+
+
+def pipe_docs(nlp, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+              n_process: int = DEFAULT_N_PROCESS) -> Iterator:
+    """
+    Прогоняет тексты через nlp.pipe батчами по batch_size, при n_process > 1 -
+    в нескольких процессах. Doc отдаются в том же порядке, что и тексты.
+    """
+    return nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
+
+Regions = Callable[[str], List[Tuple[int, int]]]
+
+
+def _iter_chunks(texts: Iterable[str], max_chars: int, overlap: int, regions: Optional[Regions]):
+    """Куски всех текстов подряд как (кусок, (номер текста, смещение, последний ли кусок))."""
+    for index, text in enumerate(texts):
+        bounds = regions(text) if regions else [(0, len(text))]
+        chunks = [
+            (region_start + start, region_start + end)
+            for region_start, region_end in bounds
+            for start, end in split_text(text[region_start:region_end], max_chars=max_chars, overlap=overlap)
+        ]
+        if not chunks:
+            # Нечего распознавать, но результат для текста все равно нужен
+            chunks = [(0, 0)]
+        for i, (start, end) in enumerate(chunks):
+            yield text[start:end], (index, start, i == len(chunks) - 1)
+
+
+def extract_spans(nlp, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                  n_process: int = DEFAULT_N_PROCESS, max_chars: int = DEFAULT_MAX_CHUNK_CHARS,
+                  overlap: int = DEFAULT_CHUNK_OVERLAP, label: str = TARGET_LABEL,
+                  regions: Optional[Regions] = None) -> Iterator[List[Tuple[int, int, str]]]:
+    """
+    Отдает сущности (start, end, label) для каждого текста, сохраняя порядок.
+    Длинные тексты делятся на куски до max_chars символов (split_text), куски всех
+    текстов идут в nlp.pipe одним потоком, а сущности переводятся в смещения
+    исходного текста и объединяются между кусками (merge_spans).
+    regions(text) ограничивает распознавание участками текста (например,
+    prefilter.anchor_windows), остальной текст в модель не попадает.
+    """
+    docs = nlp.pipe(_iter_chunks(texts, max_chars, overlap, regions), as_tuples=True,
+                    batch_size=batch_size, n_process=n_process)
+    spans = []
+    for doc, (index, offset, is_last) in docs:
+        spans.extend(
+            (offset + ent.start_char, offset + ent.end_char, ent.label_)
+            for ent in doc.ents if ent.label_ == label
+        )
+        if is_last:
+            yield merge_spans(spans)
+            spans = []
+
+
+def extract_products(nlp, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                     n_process: int = DEFAULT_N_PROCESS, max_chars: int = DEFAULT_MAX_CHUNK_CHARS,
+                     overlap: int = DEFAULT_CHUNK_OVERLAP, label: str = TARGET_LABEL,
+                     regions: Optional[Regions] = None) -> Iterator[List[str]]:
+    """Отдает список уникальных продуктов для каждого текста (см. extract_spans)."""
+    texts = list(texts)
+    all_spans = extract_spans(nlp, texts, batch_size=batch_size, n_process=n_process,
+                              max_chars=max_chars, overlap=overlap, label=label, regions=regions)
+    for text, spans in zip(texts, all_spans):
+        products = [text[start:end].strip() for start, end, _ in spans]
+        yield list(dict.fromkeys(products))
@@ -0,0 +1,117 @@
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ExtractionJob
+from .result_cache import get_cached_products, cache_products
+from .services import scrape_and_extract_text, extract_products_with_ner
+
+logger = logging.getLogger(__name__)
+
+# Задача в статусе running дольше этого срока считается брошенной (воркер упал)
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+# После стольких захватов брошенная задача не возвращается в очередь, а падает:
+# иначе страница, на которой падает воркер, крутилась бы в очереди вечно
+MAX_JOB_ATTEMPTS = 3
+# Завершенные задачи (done/failed) хранятся столько, потом удаляются
+FINISHED_JOB_RETENTION = timedelta(days=7)
+
+
+def enqueue_job(url: str) -> ExtractionJob:
+    """Ставит URL в очередь и сразу возвращает созданную задачу."""
+    job = ExtractionJob.objects.create(url=url)
+    logger.info(f"Queued extraction job {job.pk} for URL: {url}")
+    return job
+
+
+def claim_next_job() -> Optional[ExtractionJob]:
+    """
+    Забирает самую старую ожидающую задачу. Захват через условный UPDATE,
+    поэтому несколько воркеров (в том числе в разных процессах) не возьмут
+    одну задачу дважды.
+    """
+    while True:
+        job = ExtractionJob.objects.filter(status=ExtractionJob.STATUS_PENDING).order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        with transaction.atomic():
+            claimed = ExtractionJob.objects.filter(pk=job.pk, status=ExtractionJob.STATUS_PENDING).update(
+                status=ExtractionJob.STATUS_RUNNING, started_at=now, attempts=F('attempts') + 1
+            )
+        if claimed:
+            job.status = ExtractionJob.STATUS_RUNNING
+            job.started_at = now
+            job.attempts += 1
+            return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Возвращает в очередь задачи, зависшие в статусе running. Задачи, которые
+    забирали уже MAX_JOB_ATTEMPTS раз, вместо этого помечаются failed.
+    Возвращает число задач, поставленных в очередь снова.
+    """
+    now = timezone.now()
+    stale = ExtractionJob.objects.filter(status=ExtractionJob.STATUS_RUNNING, started_at__lt=now - STALE_JOB_TIMEOUT)
+    failed = stale.filter(attempts__gte=MAX_JOB_ATTEMPTS).update(
+        status=ExtractionJob.STATUS_FAILED, finished_at=now,
+        error=f"Extraction did not finish after {MAX_JOB_ATTEMPTS} attempts.",
+    )
+    if failed:
+        logger.error(f"Gave up on {failed} extraction jobs after {MAX_JOB_ATTEMPTS} attempts.")
+    count = stale.update(status=ExtractionJob.STATUS_PENDING, started_at=None)
+    if count:
+        logger.warning(f"Requeued {count} stale extraction jobs.")
+    return count
+
+
+def purge_finished_jobs() -> int:
+    """Удаляет задачи done/failed, завершенные раньше FINISHED_JOB_RETENTION назад."""
+    deadline = timezone.now() - FINISHED_JOB_RETENTION
+    count, _ = ExtractionJob.objects.filter(
+        status__in=[ExtractionJob.STATUS_DONE, ExtractionJob.STATUS_FAILED], finished_at__lt=deadline
+    ).delete()
+    if count:
+        logger.info(f"Purged {count} finished extraction jobs.")
+    return count
+
+
+def run_job(job: ExtractionJob) -> ExtractionJob:
+    """Выполняет задачу: скачивание, NER, сохранение результата."""
+    logger.info(f"Running extraction job {job.pk} for URL: {job.url}")
+    try:
+        products = get_cached_products(job.url)
+        if products is None and apps.get_app_config('extractor').get_nlp_model() is None:
+            job.status = ExtractionJob.STATUS_FAILED
+            job.error = "NER model is not loaded."
+            products = []
+        elif products is None:
+            text, scrape_error = scrape_and_extract_text(job.url)
+            if scrape_error:
+                job.status = ExtractionJob.STATUS_FAILED
+                job.error = f"Failed to process URL: {scrape_error}"
+                products = []
+            else:
+                products = extract_products_with_ner(text) if text else []
+                if products is None:
+                    job.status = ExtractionJob.STATUS_FAILED
+                    job.error = "Error during NER processing."
+                    products = []
+                elif text:
+                    cache_products(job.url, products)
+        if job.status != ExtractionJob.STATUS_FAILED:
+            job.status = ExtractionJob.STATUS_DONE
+        job.products = products
+    except Exception as e:
+        logger.error(f"Extraction job {job.pk} failed: {e}", exc_info=True)
+        job.status = ExtractionJob.STATUS_FAILED
+        job.error = "An unexpected error occurred during extraction."
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'products', 'error', 'finished_at'])
+    return job
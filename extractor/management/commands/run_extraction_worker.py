@@ -0,0 +1,49 @@
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from extractor.jobs import claim_next_job, purge_finished_jobs, requeue_stale_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Processes queued extraction jobs (ExtractionJob) in a loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Process the jobs currently queued and exit.")
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        if settings.NER_WARMUP:
+            # Загружаем модель сразу, а не на первой задаче
+            apps.get_app_config('extractor').warmup()
+        self.stdout.write("Extraction worker started.")
+        requeue_stale_jobs()
+        purge_finished_jobs()
+        last_stale_check = time.monotonic()
+        processed = 0
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    if time.monotonic() - last_stale_check > 60:
+                        requeue_stale_jobs()
+                        purge_finished_jobs()
+                        last_stale_check = time.monotonic()
+                    time.sleep(poll_interval)
+                    continue
+                job = run_job(job)
+                processed += 1
+                self.stdout.write(f"Job {job.pk}: {job.status} ({len(job.products)} products)")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Extraction worker stopped after {processed} jobs.")
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-17 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractionjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,31 @@
 from django.db import models
 
-# Create your models here.
+
+class ExtractionJob(models.Model):
+    """Фоновая задача извлечения продуктов по URL (очередь в базе данных)."""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    url = models.URLField(max_length=2048)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    products = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)  # Сколько раз воркер забирал задачу
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.url} ({self.status})"
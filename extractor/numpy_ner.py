@@ -0,0 +1,579 @@
+import json
+import os
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Файлы, которые пишет scripts/export_numpy_model.py
+CONFIG_FILE = 'config.json'
+WEIGHTS_FILE = 'weights.npz'
+FORMAT_VERSION = 1
+
+# Действия BILUO в нумерации spaCy (spacy/pipeline/_parser_internals/ner.pyx)
+MOVE_NAMES = ['M', 'B', 'I', 'L', 'U', 'O']
+MISSING, BEGIN, IN, LAST, UNIT, OUT = range(len(MOVE_NAMES))
+
+DEFAULT_BATCH_SIZE = 64
+# Разобранные куски текста между пробелами, как max_cache_size у spacy.Tokenizer
+MAX_CACHE_SIZE = 10000
+LAYER_NORM_EPS = 1e-08
+UINT64_MASK = (1 << 64) - 1
+MURMUR64_M = 0xc6a4a7935bd1e995
+MURMUR64_R = 47
+# \s в re для str - те же символы, что str.isspace() в токенизаторе spaCy
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class Entity(NamedTuple):
+    start_char: int
+    end_char: int
+    label_: str
+    text: str
+
+
+class Doc(NamedTuple):
+    """Результат разбора текста: то, что сервис берет из spacy.tokens.Doc."""
+    text: str
+    ents: Tuple[Entity, ...]
+
+
+def hash_string(string: str) -> int:
+    """Хэш строки, как в spaCy StringStore: MurmurHash64A от UTF-8 с seed 1."""
+    data = string.encode('utf8')
+    length = len(data)
+    h = 1 ^ ((length * MURMUR64_M) & UINT64_MASK)
+    tail_start = length - length % 8
+    for i in range(0, tail_start, 8):
+        k = (int.from_bytes(data[i:i + 8], 'little') * MURMUR64_M) & UINT64_MASK
+        k ^= k >> MURMUR64_R
+        k = (k * MURMUR64_M) & UINT64_MASK
+        h = ((h ^ k) * MURMUR64_M) & UINT64_MASK
+    if tail_start < length:
+        h = ((h ^ int.from_bytes(data[tail_start:], 'little')) * MURMUR64_M) & UINT64_MASK
+    h ^= h >> MURMUR64_R
+    h = (h * MURMUR64_M) & UINT64_MASK
+    return h ^ (h >> MURMUR64_R)
+
+
+def _fmix64(h: np.ndarray) -> np.ndarray:
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xff51afd7ed558ccd)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xc4ceb9fe1a85ec53)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def hash_ids(ids: np.ndarray, seed: int) -> np.ndarray:
+    """
+    Четыре 32-битных ключа на каждый id, как thinc ops.hash в HashEmbed
+    (MurmurHash3_x86_128_uint64 из thinc/backends/numpy_ops.pyx).
+    """
+    h1 = ids.astype(np.uint64) * np.uint64(0x87c37b91114253d5)
+    h1 = (h1 << np.uint64(31)) | (h1 >> np.uint64(33))
+    h1 *= np.uint64(0x4cf5ad432745937f)
+    h1 ^= np.uint64(seed ^ 8)
+    h2 = np.full_like(h1, seed ^ 8)
+    h1 += h2
+    h2 += h1
+    h1 = _fmix64(h1)
+    h2 = _fmix64(h2)
+    h1 += h2
+    h2 += h1
+    low = np.uint64(0xffffffff)
+    high = np.uint64(32)
+    return np.stack([h1 & low, h1 >> high, h2 & low, h2 >> high], axis=1)
+
+
+def word_shape(text: str) -> str:
+    """Форма слова как в spacy.lang.lex_attrs.word_shape: 'Xxxxx', 'dd.dd'."""
+    if len(text) >= 100:
+        return 'LONG'
+    shape = []
+    last = ''
+    seq = 0
+    for char in text:
+        if char.isalpha():
+            shape_char = 'X' if char.isupper() else 'x'
+        elif char.isdigit():
+            shape_char = 'd'
+        else:
+            shape_char = char
+        if shape_char == last:
+            seq += 1
+        else:
+            seq = 0
+            last = shape_char
+        if seq < 4:
+            shape.append(shape_char)
+    return ''.join(shape)
+
+
+def _compile(pattern) -> Optional[re.Pattern]:
+    return re.compile(pattern[0], pattern[1]) if pattern else None
+
+
+# Токен при разборе: [текст, пробел после, NORM из исключения или None]
+Token = List
+
+
+class Tokenizer:
+    """
+    Токенизатор spaCy (spacy/tokenizer.pyx), перенесенный на Python: деление
+    по пробелам, отщепление префиксов/суффиксов, инфиксы, исключения (rules)
+    и дописывание исключений с пунктуацией через поиск по токенам.
+    Регулярные выражения и исключения берутся из экспортированной модели.
+    """
+
+    def __init__(self, rules: Dict[str, List[List[Optional[str]]]], prefix=None, suffix=None,
+                 infix=None, token_match=None, url_match=None):
+        self.rules = rules
+        self.prefix_search = _compile(prefix)
+        self.suffix_search = _compile(suffix)
+        self.infix_finditer = _compile(infix)
+        self.token_match = _compile(token_match)
+        self.url_match = _compile(url_match)
+        self._cache: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        # Исключения, которые обычный проход разрежет по аффиксам (":)", "a.m."),
+        # ищутся потом как последовательности токенов (PhraseMatcher в spaCy)
+        self._special_patterns: Dict[str, List[Tuple[str, ...]]] = {}
+        for string in sorted(rules):
+            if self._find_prefix(string) or self._find_suffix(string) or ' ' in string or (
+                    self.infix_finditer and self.infix_finditer.search(string)):
+                pattern = tuple(token[0] for token in self._tokenize_affixes(string, False))
+                if pattern and pattern not in self._special_patterns.get(pattern[0], []):
+                    self._special_patterns.setdefault(pattern[0], []).append(pattern)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'Tokenizer':
+        return cls(config['rules'], prefix=config.get('prefix'), suffix=config.get('suffix'),
+                   infix=config.get('infix'), token_match=config.get('token_match'),
+                   url_match=config.get('url_match'))
+
+    def __call__(self, text: str) -> List[Token]:
+        tokens = self._tokenize_affixes(text, True)
+        if self._special_patterns:
+            tokens = self._apply_special_cases(text, tokens)
+        return tokens
+
+    def _find_prefix(self, string: str) -> int:
+        match = self.prefix_search.search(string) if self.prefix_search else None
+        return match.end() - match.start() if match else 0
+
+    def _find_suffix(self, string: str) -> int:
+        match = self.suffix_search.search(string) if self.suffix_search else None
+        return match.end() - match.start() if match else 0
+
+    def _special(self, string: str) -> List[Token]:
+        return [[orth, False, norm] for orth, norm in self.rules[string]]
+
+    def _tokenize_affixes(self, text: str, with_special_cases: bool) -> List[Token]:
+        """
+        Куски между пробельными символами. Первый пробел ' ' после слова
+        становится его признаком "пробел после", остальные пробельные символы
+        подряд - отдельным токеном (как в spaCy).
+        """
+        tokens: List[Token] = []
+        position = 0
+        for match in WHITESPACE_PATTERN.finditer(text):
+            start, end = match.span()
+            if position < start:
+                tokens.extend(self._tokenize_span(text[position:start], with_special_cases))
+            if tokens and text[start] == ' ':
+                tokens[-1][1] = True
+                start += 1
+            if start < end:
+                tokens.extend(self._tokenize_span(text[start:end], with_special_cases))
+            position = end
+        if position < len(text):
+            tokens.extend(self._tokenize_span(text[position:], with_special_cases))
+        return tokens
+
+    def _tokenize_span(self, span: str, with_special_cases: bool) -> List[Token]:
+        if with_special_cases and span in self.rules:
+            return self._special(span)
+        cached = self._cache.get(span) if with_special_cases else None
+        if cached is not None:
+            return [[orth, False, norm] for orth, norm in cached]
+        prefixes, string, suffixes = self._split_affixes(span, with_special_cases)
+        tokens = [[prefix, False, None] for prefix in prefixes]
+        tokens.extend(self._attach(string, with_special_cases))
+        tokens.extend([suffix, False, None] for suffix in reversed(suffixes))
+        if with_special_cases and len(self._cache) < MAX_CACHE_SIZE:
+            self._cache[span] = [(orth, norm) for orth, _, norm in tokens]
+        return tokens
+
+    def _split_affixes(self, string: str, with_special_cases: bool):
+        prefixes: List[str] = []
+        suffixes: List[str] = []
+        last_size = 0
+        while string and len(string) != last_size:
+            if self.token_match and self.token_match.match(string):
+                break
+            if with_special_cases and string in self.rules:
+                break
+            last_size = len(string)
+            pre_len = self._find_prefix(string)
+            if pre_len:
+                minus_pre = string[pre_len:]
+                if minus_pre and with_special_cases and minus_pre in self.rules:
+                    prefixes.append(string[:pre_len])
+                    string = minus_pre
+                    break
+            suf_len = self._find_suffix(string[pre_len:])
+            if suf_len:
+                minus_suf = string[:-suf_len]
+                if minus_suf and with_special_cases and minus_suf in self.rules:
+                    suffixes.append(string[-suf_len:])
+                    string = minus_suf
+                    break
+            if pre_len and suf_len and pre_len + suf_len <= len(string):
+                prefixes.append(string[:pre_len])
+                suffixes.append(string[-suf_len:])
+                string = string[pre_len:-suf_len]
+            elif pre_len:
+                prefixes.append(string[:pre_len])
+                string = string[pre_len:]
+            elif suf_len:
+                suffixes.append(string[-suf_len:])
+                string = string[:-suf_len]
+        return prefixes, string, suffixes
+
+    def _attach(self, string: str, with_special_cases: bool) -> List[Token]:
+        if not string:
+            return []
+        if with_special_cases and string in self.rules:
+            return self._special(string)
+        if (self.token_match and self.token_match.match(string)) or (
+                self.url_match and self.url_match.match(string)):
+            return [[string, False, None]]
+        matches = list(self.infix_finditer.finditer(string)) if self.infix_finditer else []
+        if not matches:
+            return [[string, False, None]]
+        tokens = []
+        start = 0
+        for match in matches:
+            infix_start, infix_end = match.start(), match.end()
+            if infix_start == 0:
+                continue
+            if infix_start != start:
+                tokens.append([string[start:infix_start], False, None])
+            if infix_start != infix_end:
+                tokens.append([string[infix_start:infix_end], False, None])
+            start = infix_end
+        if string[start:]:
+            tokens.append([string[start:], False, None])
+        return tokens
+
+    def _apply_special_cases(self, text: str, tokens: List[Token]) -> List[Token]:
+        orths = [token[0] for token in tokens]
+        matches = []
+        for i, orth in enumerate(orths):
+            for pattern in self._special_patterns.get(orth, ()):
+                if tuple(orths[i:i + len(pattern)]) == pattern:
+                    matches.append((i, i + len(pattern)))
+        if not matches:
+            return tokens
+
+        # Сначала длинные, при равной длине - левые; токены отвергнутых тоже заняты
+        matches.sort(key=lambda m: (m[1] - m[0], -m[0]))
+        seen = set()
+        accepted = []
+        for start, end in reversed(matches):
+            if start not in seen and end - 1 not in seen:
+                accepted.append((start, end))
+            seen.update(range(start, end))
+
+        starts = [0]
+        for orth, spacy, _ in tokens:
+            starts.append(starts[-1] + len(orth) + spacy)
+        result: List[Token] = []
+        position = 0
+        for start, end in sorted(accepted):
+            span_text = text[starts[start]:starts[end - 1] + len(orths[end - 1])]
+            if span_text not in self.rules:
+                continue
+            result.extend(tokens[position:start])
+            special = self._special(span_text)
+            special[-1][1] = tokens[end - 1][1]
+            result.extend(special)
+            position = end
+        result.extend(tokens[position:])
+        return result
+
+
+MaxoutLayer = Tuple[np.ndarray, np.ndarray, int]
+
+
+def _maxout_layer(W: np.ndarray, b: np.ndarray) -> MaxoutLayer:
+    """
+    Веса maxout thinc (nO, nP, nI) в виде матрицы (nI, nP * nO): куски идут
+    блоками по nO столбцов, и максимум берется по средней оси выхода.
+    """
+    n_out, n_pieces, n_in = W.shape
+    W = W.transpose(1, 0, 2).reshape(n_pieces * n_out, n_in)
+    return np.ascontiguousarray(W.T), np.ascontiguousarray(b.T).reshape(n_pieces * n_out), n_pieces
+
+
+def _maxout(X: np.ndarray, layer: MaxoutLayer) -> np.ndarray:
+    W, b, n_pieces = layer
+    Y = X @ W
+    Y += b
+    return Y.reshape(len(X), n_pieces, -1).max(axis=1)
+
+
+def _layer_norm(X: np.ndarray, G: np.ndarray, b: np.ndarray) -> np.ndarray:
+    mu = X.mean(axis=1, keepdims=True)
+    var = X.var(axis=1, keepdims=True) + LAYER_NORM_EPS
+    Y = (X - mu) * var ** -0.5
+    Y *= G
+    Y += b
+    return Y
+
+
+def _expand_window(X: np.ndarray, window: int) -> np.ndarray:
+    """Соседи слева и справа в одну строку (thinc seq2col), края - нули."""
+    n, width = X.shape
+    cols = np.zeros((n, 2 * window + 1, width), dtype=X.dtype)
+    for offset in range(1, window + 1):
+        cols[offset:, window - offset] = X[:-offset]
+        cols[:-offset, window + offset] = X[offset:]
+    cols[:, window] = X
+    return cols.reshape(n, width * (2 * window + 1))
+
+
+class NumpyNER:
+    """
+    NER-модель spaCy (tok2vec + TransitionBasedParser), пересобранная на NumPy:
+    токенизация, HashEmbed, MaxoutWindowEncoder и жадный разбор BILUO с теми же
+    ограничениями на действия. Импорт spaCy и thinc не нужен. Веса выгружает
+    scripts/export_numpy_model.py, совпадение с spaCy проверяет
+    scripts/check_numpy_parity.py.
+    """
+
+    def __init__(self, config: dict, weights: Dict[str, np.ndarray]):
+        if config.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported numpy model format: {config.get('format')}")
+        self.meta = config.get('meta', {})
+        self.tokenizer = Tokenizer.from_config(config['tokenizer'])
+        self.norms: Dict[str, str] = config['norms']
+        # Строки из spacy.symbols (например, форма 'X') имеют в StringStore фиксированные id, а не хэши
+        self.symbols: Dict[str, int] = config['symbols']
+        self.attrs: List[str] = config['embed']['attrs']
+        self.seeds: List[int] = config['embed']['seeds']
+        self.window = config['encode']['window_size']
+        self.pad = config['encode']['pad']
+        self.labels = list(config['labels'])
+        self._lexemes: Dict[str, Tuple[int, ...]] = {}
+
+        w = weights
+        self.embed_tables = [w[f'embed_{i}'] for i in range(len(self.seeds))]
+        self.mix = _maxout_layer(w['mix_W'], w['mix_b'])
+        self.mix_norm = (w['mix_G'], w['mix_beta'])
+        self.encode = [
+            (_maxout_layer(w[f'encode_{i}_W'], w[f'encode_{i}_b']), (w[f'encode_{i}_G'], w[f'encode_{i}_beta']))
+            for i in range(config['encode']['depth'])
+        ]
+        self.lower = (np.ascontiguousarray(w['lower_W'].T), w['lower_b'])
+        # Признаки состояния (nF, nO, nP, nI) -> (nI, nF * nP * nO), как у maxout выше
+        n_feats, n_hidden, n_pieces, n_in = w['hidden_W'].shape
+        self.hidden_shape = (n_feats, n_pieces, n_hidden)
+        self.hidden_W = np.ascontiguousarray(
+            w['hidden_W'].transpose(0, 2, 1, 3).reshape(n_feats * n_pieces * n_hidden, n_in).T
+        )
+        self.hidden_b = np.ascontiguousarray(w['hidden_b'].T)
+        self.hidden_pad = np.ascontiguousarray(w['hidden_pad'][0].transpose(0, 2, 1))
+        self.upper = (np.ascontiguousarray(w['upper_W'].T), w['upper_b'])
+
+        moves = np.array([MOVE_NAMES.index(move) for move, _ in config['moves']])
+        # Метка 0 - "без метки", как в spaCy (U- для запрещенных сущностей)
+        self.move_labels = np.array(
+            [self.labels.index(label) + 1 if label else 0 for _, label in config['moves']], dtype=np.int32
+        )
+        self.moves = moves
+        has_label = self.move_labels != 0
+        self.is_begin, self.is_in, self.is_last, self.is_unit = (
+            (moves == move) & has_label for move in (BEGIN, IN, LAST, UNIT)
+        )
+        self.is_out = moves == OUT
+        self.unseen_classes = np.array(config.get('unseen_classes', []), dtype=np.int64)
+
+    @classmethod
+    def from_disk(cls, path: str) -> 'NumpyNER':
+        with open(os.path.join(path, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        with np.load(os.path.join(path, WEIGHTS_FILE)) as data:
+            weights = {name: data[name] for name in data.files}
+        return cls(config, weights)
+
+    def __call__(self, text: str) -> Doc:
+        return next(iter(self.pipe([text])))
+
+    def pipe(self, texts: Iterable, as_tuples: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+             n_process: int = 1) -> Iterator:
+        """
+        Аналог nlp.pipe: тексты обрабатываются батчами по batch_size, и матричные
+        операции идут сразу по всему батчу. n_process принимается для
+        совместимости и не используется: все считается в текущем процессе.
+        """
+        items = iter(texts)
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                return
+            if as_tuples:
+                docs = self._predict([text for text, _ in batch])
+                yield from zip(docs, (context for _, context in batch))
+            else:
+                yield from self._predict(batch)
+
+    def tokenize(self, text: str) -> List[Tuple[str, int]]:
+        """Токены текста как (текст токена, смещение начала)."""
+        tokens = []
+        idx = 0
+        for orth, spacy, _ in self.tokenizer(text):
+            tokens.append((orth, idx))
+            idx += len(orth) + spacy
+        return tokens
+
+    def _string_id(self, string: str) -> int:
+        symbol = self.symbols.get(string)
+        return symbol if symbol is not None else hash_string(string)
+
+    def _lexeme(self, orth: str) -> Tuple[int, ...]:
+        """id признаков лексемы в порядке self.attrs и признак пробельного токена."""
+        lexeme = self._lexemes.get(orth)
+        if lexeme is None:
+            values = {
+                'ORTH': orth,
+                'LOWER': orth.lower(),
+                'NORM': self.norms.get(orth, orth.lower()),
+                'PREFIX': orth[0],
+                'SUFFIX': orth[-3:],
+                'SHAPE': word_shape(orth),
+            }
+            lexeme = tuple(self._string_id(values[attr]) for attr in self.attrs) + (orth.isspace(),)
+            self._lexemes[orth] = lexeme
+        return lexeme
+
+    def _features(self, tokens: List[Token]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.array([self._lexeme(orth) for orth, _, _ in tokens], dtype=np.uint64)
+        ids, is_space = rows[:, :-1], rows[:, -1].astype(bool)
+        if 'NORM' in self.attrs:
+            column = self.attrs.index('NORM')
+            for i, (_, _, norm) in enumerate(tokens):
+                if norm is not None:
+                    # NORM из исключения токенизатора ("'cause" -> "because")
+                    ids[i, column] = self._string_id(norm)
+        return ids, is_space
+
+    def _tok2vec(self, ids: np.ndarray, lengths: List[int]) -> np.ndarray:
+        columns = []
+        for i, (table, seed) in enumerate(zip(self.embed_tables, self.seeds)):
+            keys = hash_ids(ids[:, i], seed) % np.uint64(table.shape[0])
+            rows = table[keys[:, 0]] + table[keys[:, 1]]
+            rows += table[keys[:, 2]]
+            rows += table[keys[:, 3]]
+            columns.append(rows)
+        X = _layer_norm(_maxout(np.concatenate(columns, axis=1), self.mix), *self.mix_norm)
+
+        # Между документами pad нулевых строк, как в thinc with_array: окна
+        # свертки не заходят в соседний документ
+        padded = np.zeros((len(X) + self.pad * (len(lengths) + 1), X.shape[1]), dtype=np.float32)
+        rows = np.empty(len(X), dtype=np.int64)
+        start = 0
+        for i, length in enumerate(lengths):
+            offset = self.pad * (i + 1) + start
+            padded[offset:offset + length] = X[start:start + length]
+            rows[start:start + length] = np.arange(offset, offset + length)
+            start += length
+        for maxout, norm in self.encode:
+            padded += _layer_norm(_maxout(_expand_window(padded, self.window), maxout), *norm)
+        return padded[rows]
+
+    def _parse(self, tokvecs: np.ndarray, lengths: List[int], is_space: np.ndarray) -> List[list]:
+        """
+        Жадный разбор BILUO сразу для всех документов батча: на шаге t каждый
+        документ длиннее t принимает решение о своем токене t.
+        """
+        lower = tokvecs @ self.lower[0]
+        lower += self.lower[1]
+        # Вклад каждого токена в каждый признак состояния; строка 0 - пустой признак
+        cached = np.empty((len(lower) + 1,) + self.hidden_shape, dtype=np.float32)
+        cached[0] = self.hidden_pad
+        cached[1:] = (lower @ self.hidden_W).reshape((len(lower),) + self.hidden_shape)
+        upper_W, upper_b = self.upper
+
+        # Документы по убыванию длины: активные на шаге t - первые n_active[t]
+        order = np.argsort(-np.array(lengths), kind='stable')
+        lengths_sorted = np.array(lengths)[order]
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[order]
+        n_active = np.searchsorted(-lengths_sorted, -np.arange(lengths_sorted[0]), side='left')
+        is_open = np.zeros(len(order), dtype=bool)
+        ent_start = np.zeros(len(order), dtype=np.int64)
+        ent_label = np.zeros(len(order), dtype=np.int32)
+        entities: List[list] = [[] for _ in lengths]
+
+        for t, k in enumerate(n_active.tolist()):
+            b0 = offsets[:k] + t
+            open_ = is_open[:k]
+            # Признаки ner: текущий токен, начало открытой сущности и предыдущий токен
+            unmaxed = cached[b0 + 1, 0] + cached[np.where(open_, offsets[:k] + ent_start[:k] + 1, 0), 1]
+            unmaxed += cached[np.where(open_, b0, 0), 2]
+            unmaxed += self.hidden_b
+            scores = unmaxed.max(axis=1) @ upper_W
+            scores += upper_b
+            if len(self.unseen_classes):
+                scores[:, self.unseen_classes] = scores.min()
+
+            # Допустимые действия: Begin/In/Last/Unit/Out.is_valid без заданных заранее сущностей
+            closed = ~open_
+            can_start = closed & ~is_space[b0]
+            has_room = lengths_sorted[:k] - t >= 2
+            same_label = ent_label[:k, None] == self.move_labels
+            valid = (can_start & has_room)[:, None] & self.is_begin
+            valid |= (open_ & has_room)[:, None] & self.is_in & same_label
+            valid |= open_[:, None] & self.is_last & same_label
+            valid |= can_start[:, None] & self.is_unit
+            valid |= closed[:, None] & self.is_out
+            best = np.where(valid, scores, -np.inf).argmax(axis=1)
+
+            moves = self.moves[best]
+            labels = self.move_labels[best]
+            for i in np.flatnonzero((moves == LAST) | (moves == UNIT)).tolist():
+                start = int(ent_start[i]) if moves[i] == LAST else t
+                entities[order[i]].append((start, t, int(labels[i])))
+            begin = moves == BEGIN
+            is_open[:k] = begin | (moves == IN)
+            ent_start[:k] = np.where(begin, t, ent_start[:k])
+            ent_label[:k] = np.where(begin, labels, ent_label[:k])
+        return entities
+
+    def _predict(self, texts: List[str]) -> List[Doc]:
+        all_tokens = [self.tokenizer(text) for text in texts]
+        lengths = [len(tokens) for tokens in all_tokens]
+        if not any(lengths):
+            return [Doc(text, ()) for text in texts]
+        ids, is_space = self._features([token for tokens in all_tokens for token in tokens])
+        entities = self._parse(self._tok2vec(ids, lengths), lengths, is_space)
+
+        docs = []
+        for text, tokens, doc_entities in zip(texts, all_tokens, entities):
+            starts = []
+            idx = 0
+            for orth, spacy, _ in tokens:
+                starts.append(idx)
+                idx += len(orth) + spacy
+            ents = []
+            for start, end, label in doc_entities:
+                start_char = starts[start]
+                end_char = starts[end] + len(tokens[end][0])
+                ents.append(Entity(start_char, end_char, self.labels[label - 1], text[start_char:end_char]))
+            docs.append(Doc(text, tuple(ents)))
+        return docs
+
+
+def load(path: str) -> NumpyNER:
+    return NumpyNER.from_disk(path)
@@ -0,0 +1,35 @@
+from typing import List, Tuple
+
+# Словарь якорей и автомат Ахо-Корасик - те же, что размечали обучающие данные
+from converter import ANCHOR_MATCHER
+
+# Название стоит перед якорем ("Hamar Plant Stand"), атрибуты - после ("- Ash")
+DEFAULT_WINDOW_BEFORE = 150
+DEFAULT_WINDOW_AFTER = 100
+
+
+def anchor_windows(text: str, before: int = DEFAULT_WINDOW_BEFORE, after: int = DEFAULT_WINDOW_AFTER,
+                   matcher=ANCHOR_MATCHER) -> List[Tuple[int, int]]:
+    """
+    Участки текста вокруг якорей PRODUCT_ANCHORS: before символов до якоря и
+    after после, с расширением до границ слов. Пересекающиеся участки
+    сливаются. Если якорей нет - пустой список.
+    """
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        # Смещения в lower() не совпадают с исходными (например, 'İ') - не фильтруем
+        return [(0, len(text))]
+
+    windows: List[Tuple[int, int]] = []
+    for match in matcher.find_all(text_lower):
+        start = max(match["start"] - before, 0)
+        if start:
+            start = text.rfind(" ", 0, start) + 1
+        end = text.find(" ", min(match["end"] + after, len(text)))
+        if end == -1:
+            end = len(text)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
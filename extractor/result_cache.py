@@ -0,0 +1,113 @@
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'extraction'
+MODEL_VERSION_KEY = 'model_version'
+# Параметры ссылок, которые не меняют содержимое страницы
+TRACKING_PARAMS = ('utm_', 'gclid', 'fbclid', 'mc_cid', 'mc_eid', '_ga')
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+# Настройки, от которых зависит результат извлечения: входят в версию модели
+RESULT_SETTINGS = (
+    'NER_BACKEND', 'NER_MAX_CHUNK_CHARS', 'NER_CHUNK_OVERLAP',
+    'NER_ANCHOR_PREFILTER', 'NER_ANCHOR_WINDOW_BEFORE', 'NER_ANCHOR_WINDOW_AFTER',
+    'HTML_TEXT_BACKEND', 'HTML_CONTENT_SELECTORS', 'HTML_MAX_BYTES',
+)
+
+_model_version = None
+_model_version_checked = False
+
+
+def normalize_url(url: str) -> str:
+    """Приводит URL к каноническому виду: регистр хоста, порт, якорь, метки трекинга."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        # Порт вне 0-65535 или не число: такой URL все равно не скачается,
+        # ошибку вернет сам запрос, а в ключ кэша идет netloc как есть
+        host = parts.netloc.lower()
+    else:
+        host = (parts.hostname or '').lower()
+        if port and str(port) != DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{port}"
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def get_model_version() -> str:
+    """
+    Версия модели - хэш meta.json активной модели (training/model-best или
+    ее NumPy-экспорт, куда meta.json копируется) вместе с RESULT_SETTINGS.
+    После переобучения меняются метрики и другие поля meta.json, а значит и
+    версия; то же при смене нарезки текста или префильтра.
+    """
+    global _model_version
+    if _model_version is None:
+        model_path = settings.NUMPY_MODEL_PATH if settings.NER_BACKEND == 'numpy' else settings.SPACY_MODEL_PATH
+        meta_path = os.path.join(model_path, 'meta.json')
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read model meta from {meta_path}: {e}")
+            meta = b'unknown'
+        result_settings = {name: getattr(settings, name) for name in RESULT_SETTINGS}
+        digest = hashlib.sha256(meta)
+        digest.update(json.dumps(result_settings, sort_keys=True).encode('utf-8'))
+        _model_version = digest.hexdigest()[:16]
+    return _model_version
+
+
+def _cache():
+    """
+    Кэш результатов. При первом обращении в процессе проверяет, какой моделью
+    посчитаны сохраненные результаты, и при смене модели очищает кэш целиком.
+    """
+    global _model_version_checked
+    cache = caches[CACHE_ALIAS]
+    if not _model_version_checked:
+        model_version = get_model_version()
+        if cache.get(MODEL_VERSION_KEY) != model_version:
+            logger.info(f"Model version changed to {model_version}, clearing extraction cache.")
+            cache.clear()
+            cache.set(MODEL_VERSION_KEY, model_version, timeout=None)
+        _model_version_checked = True
+    return cache
+
+
+def _key(url: str) -> str:
+    digest = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+    return f"products:{get_model_version()}:{digest}"
+
+
+def get_cached_products(url: str) -> Optional[List[str]]:
+    """Возвращает сохраненный список продуктов для URL или None."""
+    try:
+        return _cache().get(_key(url))
+    except Exception as e:
+        logger.error(f"Error reading extraction cache: {e}", exc_info=True)
+        return None
+
+
+def cache_products(url: str, products: List[str]):
+    """Сохраняет список продуктов для URL на EXTRACTION_CACHE_TTL секунд."""
+    try:
+        _cache().set(_key(url), products, timeout=settings.EXTRACTION_CACHE_TTL)
+    except Exception as e:
+        logger.error(f"Error writing extraction cache: {e}", exc_info=True)
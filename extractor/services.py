@@ -1,8 +1,16 @@
 import requests
-from bs4 import BeautifulSoup
 from django.apps import apps
+from django.conf import settings
 import logging
-from typing import List, Tuple, Optional
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple, Optional
+
+from .html_text import extract_text
+from .http_cache import HTTPCache
+from .http_session import build_session, connection_stats
+from .inference import extract_products
 
 logger = logging.getLogger(__name__)
 
@@ -10,25 +18,51 @@ REQUEST_TIMEOUT = 15
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
 
-def extract_text_from_html(html_content: str) -> Optional[str]:
-    """Извлекает основной текст из HTML (аналогично scraper.py)."""
-    if not html_content:
-        return None
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'link', 'meta']):
-            tag.decompose()
-
-        main_content = soup.find('main') or soup.find('article') or soup.body
-        if main_content:
-            text = main_content.get_text(separator=' ', strip=True)
-            cleaned_text = ' '.join(text.split())
-            return cleaned_text if len(cleaned_text) > 50 else None
-        else:
-            return None
-    except Exception as e:
-        logger.error(f"Error parsing HTML: {e}", exc_info=True)
+_http_cache = None
+_http_cache_lock = threading.Lock()
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Общая для процесса сессия с пулом keep-alive соединений и повторами."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = build_session(
+                    pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                    max_retries=settings.HTTP_MAX_RETRIES,
+                    backoff_factor=settings.HTTP_RETRY_BACKOFF,
+                )
+    return _http_session
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Возвращает общий для процесса HTTP-кэш или None, если он выключен."""
+    global _http_cache
+    if not getattr(settings, 'HTTP_CACHE_ENABLED', False):
         return None
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HTTPCache(
+                    settings.HTTP_CACHE_PATH,
+                    max_bytes=settings.HTTP_CACHE_MAX_BYTES,
+                    ttl=settings.HTTP_CACHE_TTL,
+                )
+    return _http_cache
+
+
+def extract_text_from_html(html_content: str) -> Optional[str]:
+    """Извлекает основной текст из HTML так же, как scripts/scraper.py (см. html_text.py)."""
+    return extract_text(
+        html_content,
+        backend=settings.HTML_TEXT_BACKEND,
+        selectors=settings.HTML_CONTENT_SELECTORS,
+        max_bytes=settings.HTML_MAX_BYTES,
+    )
 
 
 def scrape_and_extract_text(url: str) -> Tuple[Optional[str], Optional[str]]:
@@ -38,7 +72,14 @@ def scrape_and_extract_text(url: str) -> Tuple[Optional[str], Optional[str]]:
     """
     try:
         headers = {'User-Agent': USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        session = get_http_session()
+        http_cache = get_http_cache()
+        if http_cache:
+            response = http_cache.get(url, headers=headers, timeout=REQUEST_TIMEOUT, session=session)
+        else:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"HTTP connection pool: {connection_stats(session)}")
         response.raise_for_status()
 
         content_type = response.headers.get('content-type', '').lower()
@@ -70,32 +111,118 @@ def scrape_and_extract_text(url: str) -> Tuple[Optional[str], Optional[str]]:
         return None, "An unexpected error occurred during scraping."
 
 
-def extract_products_with_ner(text: str) -> List[str]:
-    """Обрабатывает текст с помощью загруженной NER модели."""
+def get_ner_regions():
+    """
+    При NER_ANCHOR_PREFILTER модель получает только участки вокруг якорей
+    из converter.PRODUCT_ANCHORS, иначе весь текст (None).
+    """
+    if not settings.NER_ANCHOR_PREFILTER:
+        return None
+    # prefilter импортирует converter и строит автомат якорей - только при включенном фильтре
+    from .prefilter import anchor_windows
+
+    return partial(anchor_windows, before=settings.NER_ANCHOR_WINDOW_BEFORE, after=settings.NER_ANCHOR_WINDOW_AFTER)
+
+
+def extract_products_with_ner(text: str) -> Optional[List[str]]:
+    """
+    Обрабатывает текст с помощью загруженной NER модели.
+    Возвращает None, если модель не загружена или разбор упал: такой
+    результат нельзя кэшировать как "продуктов нет".
+    """
     products = []
     # Получаем доступ к загруженной модели через AppConfig
     extractor_config = apps.get_app_config('extractor')
-    nlp = extractor_config.nlp_model
+    nlp = extractor_config.get_nlp_model()
 
     if nlp is None:
         logger.error("NER model is not loaded. Cannot extract products.")
 
-        return []
+        return None
 
     if not text:
         return []
 
     try:
-        doc = nlp(text)
-        for ent in doc.ents:
-            if ent.label_ == 'PRODUCT':
-                products.append(ent.text.strip())
-
-        products = list(dict.fromkeys(products))
+        # Куски одной страницы идут одним батчем, без дополнительных процессов
+        products = next(extract_products(
+            nlp, [text], batch_size=settings.NER_BATCH_SIZE, n_process=1,
+            max_chars=settings.NER_MAX_CHUNK_CHARS, overlap=settings.NER_CHUNK_OVERLAP,
+            regions=get_ner_regions(),
+        ))
         logger.info(f"Found {len(products)} potential products.")
     except Exception as e:
         logger.error(f"Error during NER processing: {e}", exc_info=True)
 
-        return []
+        return None
 
     return products
+
+
+def scrape_many(urls: List[str], timeout: Optional[float] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Параллельно скачивает несколько URL (до BATCH_FETCH_WORKERS одновременно).
+    Возвращает список (текст, сообщение_об_ошибке) в порядке urls. URL, не
+    скачанные за timeout секунд на весь вызов, возвращаются с ошибкой; их
+    потоки дорабатывают в фоне, не задерживая ответ.
+    """
+    if not urls:
+        return []
+    workers = min(settings.BATCH_FETCH_WORKERS, len(urls))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(scrape_and_extract_text, url) for url in urls]
+        wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for url, future in zip(urls, futures):
+        if future.done() and not future.cancelled():
+            results.append(future.result())
+        else:
+            logger.warning(f"Batch fetch time budget exceeded before {url} was fetched.")
+            results.append((None, "The batch time budget was exceeded before this URL was fetched."))
+    return results
+
+
+def iter_products_from_texts(texts: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Пакетная обработка текстов через nlp.pipe (NER_BATCH_SIZE, NER_N_PROCESS).
+    Отдает списки продуктов в порядке texts.
+    """
+    extractor_config = apps.get_app_config('extractor')
+    nlp = extractor_config.get_nlp_model()
+
+    if nlp is None:
+        raise RuntimeError("NER model is not loaded.")
+
+    yield from extract_products(
+        nlp,
+        (text or '' for text in texts),
+        batch_size=settings.NER_BATCH_SIZE,
+        n_process=settings.NER_N_PROCESS,
+        max_chars=settings.NER_MAX_CHUNK_CHARS,
+        overlap=settings.NER_CHUNK_OVERLAP,
+        regions=get_ner_regions(),
+    )
+
+
+def extract_products_from_texts(texts: List[str]) -> Optional[List[List[str]]]:
+    """
+    Обрабатывает несколько текстов одним проходом nlp.pipe.
+    Возвращает списки продуктов в порядке texts или None, если модель не
+    загружена или разбор упал.
+    """
+    if apps.get_app_config('extractor').get_nlp_model() is None:
+        logger.error("NER model is not loaded. Cannot extract products.")
+        return None
+
+    try:
+        results = list(iter_products_from_texts(texts))
+        logger.info(f"Found products in {sum(1 for r in results if r)}/{len(texts)} texts.")
+    except Exception as e:
+        logger.error(f"Error during batch NER processing: {e}", exc_info=True)
+        return None
+
+    return results
@@ -1,3 +1,132 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import async_services, jobs, result_cache, services
+from .models import ExtractionJob
+from .result_cache import normalize_url
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'extraction': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'extraction-tests'},
+}
+
+
+class NormalizeUrlTests(SimpleTestCase):
+    def test_drops_default_port_fragment_and_tracking(self):
+        self.assertEqual(
+            normalize_url('HTTPS://Shop.Example:443/chairs/?utm_source=x&b=2&a=1#top'),
+            'https://shop.example/chairs?a=1&b=2',
+        )
+
+    def test_out_of_range_port_does_not_raise(self):
+        self.assertEqual(normalize_url('http://Shop.Example:99999/'), 'http://shop.example:99999/')
+
+
+class ModelVersionTests(SimpleTestCase):
+    def version(self, **overrides):
+        result_cache._model_version = None
+        try:
+            with override_settings(**overrides):
+                return result_cache.get_model_version()
+        finally:
+            result_cache._model_version = None
+
+    def test_chunking_and_prefilter_settings_change_version(self):
+        base = self.version()
+        self.assertEqual(self.version(), base)
+        self.assertNotEqual(self.version(NER_MAX_CHUNK_CHARS=1000), base)
+        self.assertNotEqual(self.version(NER_CHUNK_OVERLAP=50), base)
+        self.assertNotEqual(self.version(NER_ANCHOR_PREFILTER=True), base)
+        self.assertNotEqual(self.version(NER_ANCHOR_WINDOW_AFTER=10), base)
+
+
+@override_settings(CACHES=TEST_CACHES, HTTP_CACHE_ENABLED=False)
+class BadPortViewTests(SimpleTestCase):
+    def test_home_view_reports_bad_port_as_fetch_error(self):
+        response = self.client.post('/', {'url': 'http://shop.example:99999/'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Failed to process URL')
+
+
+@override_settings(CACHES=TEST_CACHES, HTTP_CACHE_ENABLED=False)
+class BatchInvalidUrlTests(SimpleTestCase):
+    def test_bad_entries_fail_alone(self):
+        urls = ['http://[::1/', 'http://shop.example:99999/', 'ftp://shop.example/']
+        response = self.client.post('/api/extract/', json.dumps({'urls': urls}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['url'] for result in results], urls)
+        self.assertTrue(results[0]['error'].startswith('Invalid URL'))
+        self.assertTrue(results[1]['error'].startswith('Failed to process URL'))
+        self.assertTrue(results[2]['error'].startswith('Invalid URL'))
+
+
+@override_settings(HTTP_MAX_RETRIES=2, HTTP_RETRY_BACKOFF=0)
+class AsyncFetchTests(SimpleTestCase):
+    url = 'http://shop.example/sofa'
+
+    def fetch(self, handler):
+        client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with mock.patch.object(async_services, '_build_async_client', client):
+            return asyncio.run(async_services._fetch(self.url, shared_client=False))
+
+    @override_settings(HTTP_CACHE_ENABLED=False)
+    def test_retries_server_errors_like_sync_session(self):
+        statuses = iter([503, 200])
+        response = self.fetch(lambda request: httpx.Response(next(statuses), text='ok'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(next(statuses, None))
+
+    def test_revalidates_through_http_cache(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get('if-none-match'))
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304, headers={'etag': '"v1"'})
+            return httpx.Response(200, headers={'etag': '"v1"', 'content-type': 'text/html'}, text='<p>Oak sofa</p>')
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, 'http_cache.sqlite')
+            with override_settings(HTTP_CACHE_ENABLED=True, HTTP_CACHE_PATH=cache_path, HTTP_CACHE_TTL=0), \
+                    mock.patch.object(services, '_http_cache', None):
+                try:
+                    first = self.fetch(handler)
+                    second = self.fetch(handler)
+                finally:
+                    services._http_cache.close()
+        self.assertEqual(seen, [None, '"v1"'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, first.text)
+
+
+class JobQueueTests(TestCase):
+    def test_stale_job_fails_after_max_attempts(self):
+        job = jobs.enqueue_job('http://shop.example/sofa')
+        for attempt in range(1, jobs.MAX_JOB_ATTEMPTS + 1):
+            claimed = jobs.claim_next_job()
+            self.assertEqual((claimed.pk, claimed.attempts), (job.pk, attempt))
+            # Воркер "упал": задача осталась running дольше STALE_JOB_TIMEOUT
+            ExtractionJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - 2 * jobs.STALE_JOB_TIMEOUT)
+            jobs.requeue_stale_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExtractionJob.STATUS_FAILED)
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_purges_only_old_finished_jobs(self):
+        old = timezone.now() - 2 * jobs.FINISHED_JOB_RETENTION
+        expired = ExtractionJob.objects.create(url='http://shop.example/1', status=ExtractionJob.STATUS_DONE, finished_at=old)
+        recent = ExtractionJob.objects.create(url='http://shop.example/2', status=ExtractionJob.STATUS_FAILED, finished_at=timezone.now())
+        pending = ExtractionJob.objects.create(url='http://shop.example/3')
+        self.assertEqual(jobs.purge_finished_jobs(), 1)
+        self.assertEqual(
+            set(ExtractionJob.objects.values_list('pk', flat=True)), {recent.pk, pending.pk}
+        )
+        self.assertFalse(ExtractionJob.objects.filter(pk=expired.pk).exists())
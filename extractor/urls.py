@@ -5,5 +5,9 @@ from . import views
 urlpatterns = [
 
     path('', views.home_view, name='home'),
+    path('async/', views.async_home_view, name='async_home'),
+    path('api/extract/', views.batch_extract_view, name='batch_extract'),
+    path('api/jobs/', views.job_submit_view, name='job_submit'),
+    path('api/jobs/<int:job_id>/', views.job_status_view, name='job_status'),
 
 ]
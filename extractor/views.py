@@ -1,11 +1,26 @@
-from django.shortcuts import render
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
 from django.http import \
-    HttpRequest
-from .services import scrape_and_extract_text, extract_products_with_ner
+    HttpRequest, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.urls import reverse
+from .jobs import enqueue_job
+from .models import ExtractionJob
+from .services import scrape_and_extract_text, extract_products_with_ner, scrape_many, extract_products_from_texts
+from .result_cache import get_cached_products, cache_products, normalize_url
+from .async_services import ascrape_and_extract_text, aextract_products_with_ner
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Модель не загружена или разбор упал; такой результат не кэшируется
+NER_FAILED_MESSAGE = "Could not run product extraction. Please try again later."
+
 
 def home_view(request: HttpRequest):
     """
@@ -24,6 +39,15 @@ def home_view(request: HttpRequest):
         else:
 
             logger.info(f"Processing URL from form: {url}")
+            cached_products = get_cached_products(url)
+            if cached_products is not None:
+                logger.info(f"Using cached result ({len(cached_products)} products) for URL: {url}")
+                context['products'] = cached_products
+                if not cached_products:
+                    context[
+                        'message'] = 'Successfully processed URL, but no product names were identified by the NER model.'
+                return render(request, 'extractor/index.html', context)
+
             text, scrape_error = scrape_and_extract_text(url)
 
             if scrape_error:
@@ -37,12 +61,167 @@ def home_view(request: HttpRequest):
             else:
 
                 products = extract_products_with_ner(text)
-                logger.info(f"Found {len(products)} products for URL: {url}")
-                context['products'] = products
-                if not products:
-                    context[
-                        'message'] = 'Successfully processed URL, but no product names were identified by the NER model.'
+                if products is None:
+                    context['error'] = NER_FAILED_MESSAGE
+                else:
+                    logger.info(f"Found {len(products)} products for URL: {url}")
+                    cache_products(url, products)
+                    context['products'] = products
+                    if not products:
+                        context[
+                            'message'] = 'Successfully processed URL, but no product names were identified by the NER model.'
 
         return render(request, 'extractor/index.html', context)
 
     return render(request, 'extractor/index.html', context)
+
+
+async def async_home_view(request: HttpRequest):
+    """
+    Асинхронный вариант home_view для ASGI: страница скачивается через httpx,
+    NER выполняется в ограниченном пуле потоков, поэтому один воркер может
+    держать много одновременных запросов.
+    """
+    context = {'form_action': reverse('async_home')}
+
+    if request.method == 'POST':
+        url = request.POST.get('url', '').strip()
+        context['submitted_url'] = url
+
+        if not url:
+            context['error'] = "Please enter a URL."
+        elif not url.startswith('http://') and not url.startswith('https://'):
+            context['error'] = "Please enter a valid URL (starting with http:// or https://)."
+        else:
+            logger.info(f"Processing URL from form (async): {url}")
+            cached_products = await sync_to_async(get_cached_products)(url)
+            if cached_products is not None:
+                logger.info(f"Using cached result ({len(cached_products)} products) for URL: {url}")
+                text, scrape_error = None, None
+                products = cached_products
+            else:
+                # Общий httpx-клиент безопасен только в долгоживущем цикле ASGI-сервера
+                text, scrape_error = await ascrape_and_extract_text(url, shared_client=isinstance(request, ASGIRequest))
+                products = None
+
+            if scrape_error:
+                logger.warning(f"Scraping failed for {url}: {scrape_error}")
+                context['error'] = f"Failed to process URL: {scrape_error}"
+            elif products is None and not text:
+                logger.warning(f"No text could be extracted from {url} after successful fetch.")
+                context[
+                    'message'] = 'Successfully processed URL, but no relevant text containing product names was found.'
+                context['products'] = []
+            else:
+                if products is None:
+                    products = await aextract_products_with_ner(text)
+                    if products is not None:
+                        logger.info(f"Found {len(products)} products for URL: {url}")
+                        await sync_to_async(cache_products)(url, products)
+                if products is None:
+                    context['error'] = NER_FAILED_MESSAGE
+                else:
+                    context['products'] = products
+                    if not products:
+                        context[
+                            'message'] = 'Successfully processed URL, but no product names were identified by the NER model.'
+
+    return render(request, 'extractor/index.html', context)
+
+
+@csrf_exempt
+@require_POST
+def batch_extract_view(request: HttpRequest):
+    """
+    JSON API: принимает {"urls": [...]}, скачивает страницы параллельно и
+    прогоняет все тексты через модель одним батчем.
+    Возвращает {"results": [{"url", "products", "error"}, ...]} в порядке urls.
+    """
+    try:
+        payload = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Request body must be valid JSON.'}, status=400)
+
+    urls = payload.get('urls') if isinstance(payload, dict) else None
+    if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+        return JsonResponse({'error': 'Expected a non-empty "urls" list of strings.'}, status=400)
+    if len(urls) > settings.BATCH_MAX_URLS:
+        return JsonResponse({'error': f'At most {settings.BATCH_MAX_URLS} URLs per request.'}, status=400)
+
+    results = [{'url': url, 'products': [], 'error': None} for url in urls]
+    # Одинаковые после normalize_url адреса скачиваются и разбираются один раз
+    to_fetch = {}
+    for i, url in enumerate(urls):
+        url = url.strip()
+        if not url.startswith('http://') and not url.startswith('https://'):
+            results[i]['error'] = "Invalid URL (must start with http:// or https://)."
+            continue
+        try:
+            normalized_url = normalize_url(url)
+        except ValueError as e:
+            # Например, незакрытый IPv6-адрес: ошибка только у этого URL, не у всего батча
+            results[i]['error'] = f"Invalid URL: {e}"
+            continue
+        cached_products = get_cached_products(url)
+        if cached_products is not None:
+            results[i]['products'] = cached_products
+        else:
+            to_fetch.setdefault(normalized_url, []).append(i)
+
+    logger.info(f"Batch request: {len(urls)} URLs, {len(to_fetch)} to fetch.")
+    fetch_groups = list(to_fetch.values())
+    scraped = scrape_many([urls[group[0]].strip() for group in fetch_groups], timeout=settings.BATCH_FETCH_BUDGET)
+
+    to_extract = []
+    for group, (text, scrape_error) in zip(fetch_groups, scraped):
+        if scrape_error:
+            for i in group:
+                results[i]['error'] = f"Failed to process URL: {scrape_error}"
+        elif text:
+            to_extract.append((group, text))
+
+    products_per_text = extract_products_from_texts([text for _, text in to_extract]) if to_extract else []
+    if products_per_text is None:
+        for group, _ in to_extract:
+            for i in group:
+                results[i]['error'] = NER_FAILED_MESSAGE
+    else:
+        for (group, _), products in zip(to_extract, products_per_text):
+            cache_products(urls[group[0]].strip(), products)
+            for i in group:
+                results[i]['products'] = products
+
+    return JsonResponse({'results': results})
+
+
+@csrf_exempt
+@require_POST
+def job_submit_view(request: HttpRequest):
+    """
+    JSON API: ставит {"url": ...} в очередь фонового воркера и сразу
+    возвращает id задачи и адрес для опроса статуса.
+    """
+    try:
+        payload = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Request body must be valid JSON.'}, status=400)
+
+    url = payload.get('url', '').strip() if isinstance(payload, dict) and isinstance(payload.get('url'), str) else ''
+    if not url.startswith('http://') and not url.startswith('https://'):
+        return JsonResponse({'error': 'Please enter a valid URL (starting with http:// or https://).'}, status=400)
+
+    job = enqueue_job(url)
+    status_url = reverse('job_status', args=[job.pk])
+    return JsonResponse({'job_id': job.pk, 'status': job.status, 'status_url': status_url}, status=202)
+
+
+@require_GET
+def job_status_view(request: HttpRequest, job_id: int):
+    """JSON API: статус задачи и, когда она готова, найденные продукты."""
+    job = get_object_or_404(ExtractionJob, pk=job_id)
+    data = {'job_id': job.pk, 'url': job.url, 'status': job.status}
+    if job.status == ExtractionJob.STATUS_DONE:
+        data['products'] = job.products
+    elif job.status == ExtractionJob.STATUS_FAILED:
+        data['error'] = job.error
+    return JsonResponse(data)
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.apps import apps
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "furniture_api.settings")
 
 application = get_asgi_application()
+
+# Management commands don't load the spaCy model; web workers load it here,
+# before the first request (with Gunicorn preload - once in the master).
+if settings.NER_WARMUP:
+    apps.get_app_config('extractor').warmup()
@@ -128,4 +128,71 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-SPACY_MODEL_PATH = os.path.join(BASE_DIR, 'training', 'model-best')
+# Set to training/model-fast to serve the smaller model from configs/config_fast.cfg
+SPACY_MODEL_PATH = os.environ.get('SPACY_MODEL_PATH', os.path.join(BASE_DIR, 'training', 'model-best'))
+# 'numpy' serves the export from scripts/export_numpy_model.py without importing spaCy (extractor.numpy_ner)
+NER_BACKEND = os.environ.get('NER_BACKEND', 'spacy')
+NUMPY_MODEL_PATH = os.environ.get('NUMPY_MODEL_PATH', os.path.join(BASE_DIR, 'training', 'model-numpy'))
+
+# On-disk HTTP cache for fetched pages (shared with scripts/scraper.py)
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', '1') == '1'
+HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', os.path.join(BASE_DIR, '.cache', 'http_cache.sqlite'))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+HTTP_CACHE_TTL = int(os.environ.get('HTTP_CACHE_TTL', 60 * 60))
+
+# Pooled keep-alive HTTP session used by extractor.services
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 20))  # hosts kept in the pool
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # connections per host
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.5))
+
+# Cache of extraction results per URL (see extractor/result_cache.py).
+# File-based so all Gunicorn workers share it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'extraction': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('EXTRACTION_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'extraction')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+EXTRACTION_CACHE_TTL = int(os.environ.get('EXTRACTION_CACHE_TTL', 6 * 60 * 60))
+
+# Batch JSON API (extractor.views.batch_extract_view)
+BATCH_MAX_URLS = int(os.environ.get('BATCH_MAX_URLS', 50))
+BATCH_FETCH_WORKERS = int(os.environ.get('BATCH_FETCH_WORKERS', 8))
+# Seconds for all fetches of one batch; keep well below GUNICORN_TIMEOUT so NER still fits in the request
+BATCH_FETCH_BUDGET = float(os.environ.get('BATCH_FETCH_BUDGET', 30))
+
+# Batched NER inference (extractor.inference / nlp.pipe)
+# Batches count text chunks; peak NER memory grows with NER_BATCH_SIZE * NER_MAX_CHUNK_CHARS
+NER_BATCH_SIZE = int(os.environ.get('NER_BATCH_SIZE', 16))
+NER_N_PROCESS = int(os.environ.get('NER_N_PROCESS', 1))
+# Long page texts are split into chunks of at most this many characters before NER (extractor.chunking)
+NER_MAX_CHUNK_CHARS = int(os.environ.get('NER_MAX_CHUNK_CHARS', 2000))
+NER_CHUNK_OVERLAP = int(os.environ.get('NER_CHUNK_OVERLAP', 200))
+# Optional gating: run NER only on windows around converter.PRODUCT_ANCHORS matches (extractor.prefilter).
+# Check the recall cost with scripts/evaluate_prefilter.py before enabling.
+NER_ANCHOR_PREFILTER = os.environ.get('NER_ANCHOR_PREFILTER', '0') == '1'
+NER_ANCHOR_WINDOW_BEFORE = int(os.environ.get('NER_ANCHOR_WINDOW_BEFORE', 150))  # chars kept before an anchor
+NER_ANCHOR_WINDOW_AFTER = int(os.environ.get('NER_ANCHOR_WINDOW_AFTER', 100))  # chars kept after an anchor
+
+# Async extraction view (extractor.views.async_home_view, served via ASGI - Procfile web-asgi)
+ASYNC_MAX_FETCHES = int(os.environ.get('ASYNC_MAX_FETCHES', 200))  # fetches in flight per process
+ASYNC_INFERENCE_WORKERS = int(os.environ.get('ASYNC_INFERENCE_WORKERS', 2))  # threads for HTML parsing + spaCy
+
+# The spaCy model is loaded lazily on first use (extractor.apps.ExtractorConfig.get_nlp_model).
+# Web entry points (wsgi.py/asgi.py) and the job worker load and warm it up at startup instead.
+NER_WARMUP = os.environ.get('NER_WARMUP', '1') == '1'
+
+# HTML-to-text extraction (extractor.html_text, shared with scripts/scraper.py)
+HTML_TEXT_BACKEND = os.environ.get('HTML_TEXT_BACKEND', 'auto')  # 'lxml', 'bs4', or 'auto' (lxml when installed)
+# Main content selectors, tried in order (tag, #id, .class); comma-separated in the env
+HTML_CONTENT_SELECTORS = tuple(
+    selector.strip() for selector in os.environ.get(
+        'HTML_CONTENT_SELECTORS', 'main,article,#content,#main-content,.content,.main,.product-details'
+    ).split(',') if selector.strip()
+)
+HTML_MAX_BYTES = int(os.environ.get('HTML_MAX_BYTES', 3 * 1024 * 1024))  # pages are truncated to this before parsing
@@ -0,0 +1,37 @@
+"""
+Gunicorn config for furniture_api (used by the Procfile).
+
+With GUNICORN_PRELOAD=1 (default) the Django app - and with it the spaCy model
+from training/model-best, loaded and warmed up in furniture_api/wsgi.py - is
+loaded once in the master process before workers are forked. Workers then
+share the model's memory pages copy-on-write instead of each loading their own
+copy. To keep those pages shared, the cyclic garbage collector is paused in
+the master and everything allocated before the fork is moved to the permanent
+generation with gc.freeze(), so collections in workers do not touch (and
+thereby copy) the preloaded objects.
+
+Measure per-worker memory with: python scripts/measure_worker_memory.py --pidfile <pidfile>
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+errorlog = '-'
+
+if preload_app:
+    # Не собираем мусор в мастере, пока грузится модель: сборка трогает
+    # заголовки объектов, и после fork эти страницы перестали бы быть общими
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
@@ -0,0 +1,217 @@
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import converter
+from extractor.corpus import load_texts
+
+# --- Конфигурация ---
+INPUT_JSON_FILE = os.path.join("../data", "raw_texts", "scraped_texts.jsonl")
+BASELINE_FILE = os.path.join("../data", "benchmarks", "annotation_baseline.json")
+REPEATS = 5
+# Размеры синтетических страниц: от 1 KB до 5 MB
+SYNTHETIC_SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+SYNTHETIC_SEED = 42
+# Допустимое замедление относительно базовой линии (0.25 = на 25%)
+REGRESSION_TOLERANCE = 0.25
+MIN_COMPARABLE_SECONDS = 0.01
+
+# Словарь для синтетических страниц: названия, шум из отзывов и интерфейса
+NAME_WORDS = ["Hamar", "Nordic", "Oslo", "Euro", "Top", "Luna", "Verona", "Bondi", "Aria", "Malmo"]
+ATTRIBUTE_WORDS = ["Oak", "Walnut", "Ash", "Black", "White", "King", "Queen", "Grey", "Leather"]
+NOISE_WORDS = [
+    "the", "and", "great", "quality", "delivery", "was", "fast", "love", "it",
+    "reviews", "Add", "to", "cart", "Regular", "price", "Sale", "shipping",
+    "returns", "5", "stars", "verified", "buyer", "Home", "Shop", "size", "color",
+]
+PRICES = ["$515", "$1,299.00", "€ 89,90", "£45", "AUD 320"]
+
+
+def load_module(filepath: str):
+    """Загружает другую версию converter.py (например, из git show) для сравнения."""
+    spec = importlib.util.spec_from_file_location("converter_compare", filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_page(size: int, seed: int = SYNTHETIC_SEED) -> str:
+    """
+    Генерирует синтетическую страницу размером около size символов:
+    строки с названиями товаров и ценами вперемешку с текстом отзывов.
+    """
+    rng = random.Random(seed + size)
+    # PRODUCT_ANCHORS собран через set: без сортировки страница зависела бы от PYTHONHASHSEED
+    product_anchors = sorted(converter.PRODUCT_ANCHORS)
+    anchors = [anchor.title() for anchor in product_anchors]
+    lines = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.3:
+            words = rng.sample(NAME_WORDS, rng.randint(1, 3))
+            words.append(rng.choice(anchors))
+            if rng.random() < 0.5:
+                words += ["-", rng.choice(ATTRIBUTE_WORDS)]
+            words += ["Regular", "price", rng.choice(PRICES)]
+        else:
+            words = [rng.choice(NOISE_WORDS) for _ in range(rng.randint(5, 40))]
+            if rng.random() < 0.3:
+                words.insert(rng.randrange(len(words)), rng.choice(product_anchors))
+        line = " ".join(words)
+        lines.append(line)
+        length += len(line) + 1
+        if rng.random() < 0.1:
+            lines.append("")
+            length += 1
+    return "\n".join(lines)[:size]
+
+
+def time_records(module, texts: list, repeats: int) -> float:
+    """Лучшее из repeats время разметки всех текстов (в секундах)."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in texts:
+            module.get_potential_spans(
+                text, module.PRODUCT_ANCHORS, module.EXCLUSION_KEYWORDS
+            )
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_memory(module, texts: list) -> int:
+    """Пиковое выделение памяти Python (в байтах) за один проход разметки."""
+    tracemalloc.start()
+    try:
+        for text in texts:
+            module.get_potential_spans(
+                text, module.PRODUCT_ANCHORS, module.EXCLUSION_KEYWORDS
+            )
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name: str, module, texts: list, repeats: int) -> dict:
+    seconds = time_records(module, texts, repeats)
+    result = {
+        "records": len(texts),
+        "chars": sum(len(t) for t in texts),
+        "seconds": seconds,
+        "records_per_sec": len(texts) / seconds,
+        "peak_memory_bytes": peak_memory(module, texts),
+    }
+    print(
+        f"{name:>16}: {seconds:8.3f} s, {result['records_per_sec']:9.1f} records/s, "
+        f"{result['chars'] / seconds / 1e6:6.2f} MB/s, "
+        f"peak {result['peak_memory_bytes'] / 2**20:7.2f} MiB"
+    )
+    return result
+
+
+def run_suite(module, corpus: list, sizes: list, repeats: int) -> dict:
+    results = {}
+    if corpus:
+        results["corpus"] = run_case("corpus", module, corpus, repeats)
+    for size in sizes:
+        page = generate_page(size)
+        # Большие страницы прогоняем меньше раз, чтобы замер не длился вечно
+        page_repeats = repeats if size <= 100_000 else 1
+        results[f"synthetic_{size}"] = run_case(
+            f"synthetic {size // 1000} KB", module, [page], page_repeats
+        )
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Возвращает список регрессий по сравнению с сохраненной базовой линией."""
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if not current:
+            continue
+        slowdown = current["seconds"] / base["seconds"] - 1
+        # Очень короткие замеры слишком шумные для сравнения по времени
+        if base["seconds"] >= MIN_COMPARABLE_SECONDS and slowdown > tolerance:
+            regressions.append(f"{name}: {slowdown:+.0%} time")
+        memory_growth = current["peak_memory_bytes"] / max(base["peak_memory_bytes"], 1) - 1
+        if memory_growth > tolerance:
+            regressions.append(f"{name}: {memory_growth:+.0%} peak memory")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Замер скорости и памяти converter.get_potential_spans."
+    )
+    parser.add_argument("--input", default=INPUT_JSON_FILE)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        default=SYNTHETIC_SIZES,
+        help="Размеры синтетических страниц в символах через запятую",
+    )
+    parser.add_argument(
+        "--compare",
+        help="Путь к другой версии converter.py (git show <rev>:converter.py > old.py)",
+    )
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Сохранить результаты как базовую линию"
+    )
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input) if os.path.exists(args.input) else []
+    if texts:
+        print(
+            f"Loaded {len(texts)} records, median length "
+            f"{statistics.median(len(t) for t in texts):.0f} chars."
+        )
+
+    print("\n--- current ---")
+    results = run_suite(converter, texts, args.sizes, args.repeats)
+
+    if args.compare:
+        other_module = load_module(args.compare)
+        print("\n--- compare ---")
+        other = run_suite(other_module, texts, args.sizes, args.repeats)
+        print("\n--- Speedup ---")
+        for name, result in results.items():
+            print(f"{name:>20}: {other[name]['seconds'] / result['seconds']:.2f}x")
+
+        mismatches = sum(
+            converter.get_potential_spans(
+                t, converter.PRODUCT_ANCHORS, converter.EXCLUSION_KEYWORDS
+            )
+            != other_module.get_potential_spans(
+                t, other_module.PRODUCT_ANCHORS, other_module.EXCLUSION_KEYWORDS
+            )
+            for t in texts
+        )
+        print(f"Records with different entities: {mismatches}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\n--- Regressions against baseline ---")
+            for regression in regressions:
+                print(regression)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
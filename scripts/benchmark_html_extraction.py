@@ -0,0 +1,118 @@
+import argparse
+import glob
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.html_text import BACKENDS
+
+# --- Конфигурация ---
+HTML_DIR = os.path.join("../data", "raw_html")
+# HTTP-кэш scraper.py: страницы, скачанные при сборе данных
+HTTP_CACHE_FILE = os.path.join("../.cache", "http_cache.sqlite")
+REPEATS = 3
+# Размеры синтетических страниц: от 10 KB до 2 MB
+SYNTHETIC_SIZES = [10_000, 100_000, 500_000, 2_000_000]
+SYNTHETIC_SEED = 42
+
+PRODUCT_NAMES = ["Hamar Plant Stand - Ash", "Euro Top Mattress - King", "Oslo Dining Table", "Luna Bar Stool"]
+REVIEW_WORDS = ["great", "quality", "delivery", "was", "fast", "love", "it", "sturdy", "easy", "to", "assemble"]
+
+
+def generate_page(size: int, seed: int = SYNTHETIC_SEED) -> str:
+    """
+    Синтетическая страница товара размером около size символов: скрипты и стили
+    в head, шапка с меню, основной блок с описанием и отзывами, подвал.
+    """
+    rng = random.Random(seed + size)
+    name = rng.choice(PRODUCT_NAMES)
+    head = (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{name}</title>"
+        "<link rel='stylesheet' href='/s.css'><style>.price{color:red}</style>"
+        f"<script type='application/ld+json'>{{\"name\": \"{name}\", \"price\": \"515.00\"}}</script></head>"
+        "<body><header><nav><ul><li><a href='/'>Home</a></li><li><a href='/shop'>Shop</a></li></ul></nav></header>"
+        f"<main><h1>{name}</h1><span class='price'>Regular price $515</span><form><button>Add to cart</button></form>"
+    )
+    parts = [head]
+    length = len(head)
+    while length < size:
+        words = " ".join(rng.choice(REVIEW_WORDS) for _ in range(rng.randint(5, 40)))
+        block = (
+            f"<div class='review'><p><b>Verified buyer</b> {words} &amp; more&nbsp;text</p>"
+            f"<!-- review --><script>track({rng.randint(0, 10 ** 6)})</script></div>"
+        )
+        parts.append(block)
+        length += len(block)
+    parts.append("</main><aside>Related products</aside><footer>&copy; 2024 Store</footer></body></html>")
+    return "".join(parts)
+
+
+def load_pages(html_dir: str, http_cache_file: str):
+    """Страницы из каталога с .html файлами и из HTTP-кэша скрапера."""
+    pages = []
+    for filepath in sorted(glob.glob(os.path.join(html_dir, "**", "*.html"), recursive=True)):
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((filepath, f.read()))
+    if os.path.exists(http_cache_file):
+        connection = sqlite3.connect(http_cache_file)
+        for url, encoding, body in connection.execute("SELECT url, encoding, body FROM responses"):
+            pages.append((url, body.decode(encoding or "utf-8", errors="replace")))
+        connection.close()
+    return pages
+
+
+def time_backend(extract, pages, repeats: int) -> float:
+    """Медианное время одного прохода по всем страницам."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _, html in pages:
+            extract(html)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def find_mismatches(pages, baseline: str, candidate: str):
+    return [name for name, html in pages if BACKENDS[baseline](html) != BACKENDS[candidate](html)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and cross-check HTML text extraction backends.")
+    parser.add_argument("--html-dir", default=HTML_DIR, help="Directory with saved .html pages")
+    parser.add_argument("--http-cache", default=HTTP_CACHE_FILE, help="scraper.py HTTP cache to take pages from")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--no-synthetic", action="store_true", help="Skip synthetic pages")
+    args = parser.parse_args()
+
+    if "lxml" not in BACKENDS:
+        print("lxml is not installed, only the bs4 backend is available.")
+        sys.exit(1)
+
+    pages = load_pages(args.html_dir, args.http_cache)
+    print(f"Loaded {len(pages)} saved pages ({sum(len(html) for _, html in pages) / 1e6:.1f} MB).")
+    if not args.no_synthetic:
+        pages += [(f"synthetic-{size}", generate_page(size)) for size in SYNTHETIC_SIZES]
+    if not pages:
+        print("No pages to benchmark.")
+        sys.exit(1)
+
+    total_mb = sum(len(html.encode("utf-8")) for _, html in pages) / 1e6
+    print(f"\n{'backend':<8}{'seconds':>10}{'ms/page':>10}{'MB/s':>10}")
+    timings = {}
+    for name in ("bs4", "lxml"):
+        timings[name] = time_backend(BACKENDS[name], pages, args.repeats)
+        print(f"{name:<8}{timings[name]:>10.3f}{timings[name] / len(pages) * 1000:>10.2f}{total_mb / timings[name]:>10.1f}")
+    print(f"\nlxml speedup: {timings['bs4'] / timings['lxml']:.1f}x on {len(pages)} pages, {total_mb:.1f} MB")
+
+    mismatches = find_mismatches(pages, "bs4", "lxml")
+    if mismatches:
+        print(f"\nOutput differs on {len(mismatches)} pages:")
+        for name in mismatches[:20]:
+            print(f"  {name}")
+        sys.exit(1)
+    print("Output identical on all pages.")
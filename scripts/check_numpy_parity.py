@@ -0,0 +1,110 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import spacy
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from extractor.corpus import load_texts, prf, read_docs
+from extractor.inference import extract_spans
+from extractor.numpy_ner import load
+
+# --- Конфигурация ---
+SPACY_MODEL_PATH = os.path.join("../training", "model-best")
+NUMPY_MODEL_PATH = os.path.join("../training", "model-numpy")
+DEV_DATA_PATH = os.path.join("../data", "spacy_data", "dev")
+TEXTS_FILE = os.path.join("../data", "raw_texts", "scraped_texts.jsonl")
+BATCH_SIZE = 16
+LABEL = "PRODUCT"
+SHOW_DIFFS = 5
+
+# Загрузка модели и разбор одного текста в чистом процессе: время и пик RSS
+STARTUP_SNIPPETS = {
+    "spacy": "import spacy; nlp = spacy.load({path!r})",
+    "numpy": "from extractor.numpy_ner import load; nlp = load({path!r})",
+}
+# Пик RSS берем из VmHWM: ru_maxrss после exec наследует пик родителя
+STARTUP_TEMPLATE = (
+    "import re, sys, time; started = time.perf_counter(); sys.path.insert(0, {root!r}); {load}; "
+    "nlp('Hamar Oak Dining Table - Regular price $515'); "
+    "print(time.perf_counter() - started, re.search(r'VmHWM:\\s+(\\d+)', open('/proc/self/status').read()).group(1))"
+)
+
+
+def timed_spans(nlp, texts, batch_size: int):
+    started = time.perf_counter()
+    spans = list(extract_spans(nlp, texts, batch_size=batch_size, label=LABEL))
+    return spans, time.perf_counter() - started
+
+
+def startup(backend: str, path: str):
+    """(секунды на импорт + загрузку + первый текст, пик RSS в MB) в отдельном процессе."""
+    code = STARTUP_TEMPLATE.format(root=PROJECT_ROOT, load=STARTUP_SNIPPETS[backend].format(path=path))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, None
+    seconds, rss_kb = result.stdout.split()
+    return float(seconds), int(rss_kb) / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the exported NumPy NER model with the spaCy model it was exported from."
+    )
+    parser.add_argument("--model", default=SPACY_MODEL_PATH, help="spaCy model directory")
+    parser.add_argument("--numpy-model", default=NUMPY_MODEL_PATH, help="Output of export_numpy_model.py")
+    parser.add_argument("--dev", default=DEV_DATA_PATH)
+    parser.add_argument("--texts", default=TEXTS_FILE, help="Extra unlabeled texts (.jsonl or .json); '' to skip")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        nlp = spacy.load(args.model)
+        numpy_nlp = load(args.numpy_model)
+    except Exception as e:
+        print(f"Error loading models: {e}")
+        sys.exit(1)
+
+    dev_docs = [doc for doc in read_docs(args.dev, nlp.vocab) if doc.text.strip()]
+    texts = [doc.text for doc in dev_docs]
+    if args.texts and os.path.exists(args.texts):
+        texts += load_texts(args.texts)
+    print(f"Comparing on {len(texts)} texts ({len(dev_docs)} from {args.dev})")
+
+    token_diffs = 0
+    for text in texts:
+        if [(token.text, token.idx) for token in nlp.make_doc(text)] != numpy_nlp.tokenize(text):
+            token_diffs += 1
+            if token_diffs <= SHOW_DIFFS:
+                print(f"  tokenization differs: {text[:80]!r}")
+
+    spacy_spans, spacy_seconds = timed_spans(nlp, texts, args.batch_size)
+    numpy_spans, numpy_seconds = timed_spans(numpy_nlp, texts, args.batch_size)
+    entity_diffs = 0
+    for text, expected, actual in zip(texts, spacy_spans, numpy_spans):
+        if expected != actual:
+            entity_diffs += 1
+            if entity_diffs <= SHOW_DIFFS:
+                only_spacy = [text[start:end] for start, end, _ in set(expected) - set(actual)]
+                only_numpy = [text[start:end] for start, end, _ in set(actual) - set(expected)]
+                print(f"  entities differ: spaCy only {only_spacy}, NumPy only {only_numpy}")
+
+    gold = {(i, ent.start_char, ent.end_char) for i, doc in enumerate(dev_docs) for ent in doc.ents if ent.label_ == LABEL}
+    print(f"\n{'backend':<10}{'P':>8}{'R':>8}{'F':>8}{'texts/s':>10}{'startup s':>11}{'RSS MB':>9}")
+    for backend, spans, seconds, path in (("spacy", spacy_spans, spacy_seconds, args.model),
+                                          ("numpy", numpy_spans, numpy_seconds, args.numpy_model)):
+        predicted = {(i, start, end) for i, text_spans in enumerate(spans[:len(dev_docs)]) for start, end, _ in text_spans}
+        precision, recall, f_score = prf(predicted, gold)
+        startup_seconds, rss = startup(backend, os.path.abspath(path))
+        startup_column = f"{startup_seconds:.2f}" if startup_seconds is not None else "-"
+        rss_column = f"{rss:.0f}" if rss is not None else "-"
+        print(f"{backend:<10}{precision:>8.3f}{recall:>8.3f}{f_score:>8.3f}{len(texts) / seconds:>10.1f}"
+              f"{startup_column:>11}{rss_column:>9}")
+
+    print(f"\nTokenization mismatches: {token_diffs}/{len(texts)}, entity mismatches: {entity_diffs}/{len(texts)}")
+    if token_diffs or entity_diffs:
+        sys.exit(1)
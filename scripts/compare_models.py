@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import spacy
+from spacy.training import Example
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.corpus import load_texts, read_docs
+
+# --- Конфигурация ---
+MODEL_PATHS = [os.path.join("../training", "model-best"), os.path.join("../training", "model-fast")]
+DEV_DATA_PATH = os.path.join("../data", "spacy_data", "dev")
+TEXTS_FILE = os.path.join("../data", "raw_texts", "scraped_texts.jsonl")
+BATCH_SIZE = 16
+REPEATS = 3
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+    )
+
+
+def meta_f1(model_path: str):
+    """ents_f из meta.json - результат, записанный при обучении."""
+    try:
+        with open(os.path.join(model_path, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("performance", {}).get("ents_f")
+    except (OSError, ValueError):
+        return None
+
+
+def docs_per_second(nlp, texts, repeats: int) -> float:
+    list(nlp.pipe(texts[:BATCH_SIZE], batch_size=BATCH_SIZE))  # прогрев
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in nlp.pipe(texts, batch_size=BATCH_SIZE):
+            pass
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(texts) / best
+
+
+def evaluate(nlp, dev_path: str):
+    dev_docs = [doc for doc in read_docs(dev_path, nlp.vocab) if doc.text.strip()]
+    examples = [Example(nlp.make_doc(doc.text), doc) for doc in dev_docs]
+    scores = nlp.evaluate(examples, batch_size=BATCH_SIZE)
+    return scores["ents_p"], scores["ents_r"], scores["ents_f"]
+
+
+def format_optional(value, pattern: str) -> str:
+    return pattern.format(value) if value is not None else "-"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Side-by-side speed, size and F1 of trained NER models.")
+    parser.add_argument("models", nargs="*", default=MODEL_PATHS, help="Model directories to compare")
+    parser.add_argument("--dev", default=DEV_DATA_PATH)
+    parser.add_argument("--texts", default=TEXTS_FILE, help="Scraped texts (.jsonl or .json) used for the speed test")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    print(f"Speed test: {len(texts)} texts from {args.texts}; F1 on {args.dev}\n")
+
+    print(f"{'model':<32}{'size MB':>9}{'docs/s':>9}{'P':>8}{'R':>8}{'F':>8}{'meta F':>8}")
+    rows = []
+    for model_path in args.models:
+        size = directory_size(model_path) / 1e6 if os.path.isdir(model_path) else None
+        speed = precision = recall = f_score = None
+        try:
+            nlp = spacy.load(model_path)
+            speed = docs_per_second(nlp, texts, args.repeats)
+            precision, recall, f_score = evaluate(nlp, args.dev)
+        except Exception as e:
+            print(f"  could not load {model_path}: {e}")
+        rows.append((model_path, speed))
+        print(f"{model_path:<32}{format_optional(size, '{:.1f}'):>9}{format_optional(speed, '{:.1f}'):>9}"
+              f"{format_optional(precision, '{:.3f}'):>8}{format_optional(recall, '{:.3f}'):>8}"
+              f"{format_optional(f_score, '{:.3f}'):>8}{format_optional(meta_f1(model_path), '{:.3f}'):>8}")
+
+    measured = [(path, speed) for path, speed in rows if speed]
+    if len(measured) > 1:
+        baseline_path, baseline_speed = measured[0]
+        for path, speed in measured[1:]:
+            print(f"\n{path}: {speed / baseline_speed:.1f}x the throughput of {baseline_path}")
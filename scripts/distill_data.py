@@ -0,0 +1,73 @@
+import argparse
+import os
+import shutil
+import sys
+
+import spacy
+from spacy.tokens import DocBin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.corpus import load_texts, read_docs
+from extractor.inference import extract_spans
+
+# --- Конфигурация ---
+TEACHER_MODEL_PATH = os.path.join("../training", "model-best")
+INPUT_FILE = os.path.join("../data", "raw_texts", "scraped_texts.jsonl")
+TRAIN_DATA_PATH = os.path.join("../data", "spacy_data", "train")
+DEV_DATA_PATH = os.path.join("../data", "spacy_data", "dev")
+# Каталог для --paths.train: копия шардов train/ и silver.spacy с разметкой учителя
+OUTPUT_DIR = os.path.join("../data", "spacy_data", "distill")
+LABEL = "PRODUCT"
+BATCH_SIZE = 16
+
+
+def load_doc_texts(filepath: str, vocab):
+    return {doc.text for doc in read_docs(filepath, vocab)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Label unlabeled scraped text with the current model (teacher) to train a smaller student model."
+    )
+    parser.add_argument("--teacher", default=TEACHER_MODEL_PATH)
+    parser.add_argument("--input", default=INPUT_FILE, help="Scraped texts (.json list or .jsonl)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    print(f"Loading teacher model from: {args.teacher}")
+    try:
+        teacher = spacy.load(args.teacher)
+    except Exception as e:
+        print(f"Error loading teacher model: {e}")
+        sys.exit(1)
+
+    # Тексты из train/dev уже размечены вручную, а dev нельзя показывать ученику
+    known_texts = load_doc_texts(TRAIN_DATA_PATH, teacher.vocab) | load_doc_texts(DEV_DATA_PATH, teacher.vocab)
+    texts = [text for text in dict.fromkeys(load_texts(args.input)) if text not in known_texts]
+    print(f"Labelling {len(texts)} unlabeled texts from {args.input}")
+
+    doc_bin = DocBin(store_user_data=False)
+    entity_count = 0
+    misaligned = 0
+    for text, spans in zip(texts, extract_spans(teacher, texts, batch_size=BATCH_SIZE, label=LABEL)):
+        doc = teacher.make_doc(text)
+        entities = []
+        for start, end, label in spans:
+            span = doc.char_span(start, end, label=label, alignment_mode="contract")
+            if span is None:
+                misaligned += 1
+                continue
+            entities.append(span)
+        doc.ents = entities
+        entity_count += len(entities)
+        doc_bin.add(doc)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    silver_path = os.path.join(args.output_dir, "silver.spacy")
+    doc_bin.to_disk(silver_path)
+    shutil.copytree(TRAIN_DATA_PATH, os.path.join(args.output_dir, "train"), dirs_exist_ok=True)
+    print(f"Saved {len(texts)} documents with {entity_count} teacher entities to {silver_path}"
+          f" ({misaligned} spans skipped: not on token boundaries)")
+    print(f"Train the student with: python -m spacy train configs/config_fast.cfg"
+          f" --output training/model-fast --paths.train {os.path.relpath(args.output_dir, '..')}")
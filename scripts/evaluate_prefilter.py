@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import time
+from functools import partial
+
+import spacy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.corpus import prf, read_docs
+from extractor.inference import extract_spans
+from extractor.prefilter import anchor_windows
+
+# --- Конфигурация ---
+MODEL_PATH = os.path.join("../training", "model-best")
+DEV_DATA_PATH = os.path.join("../data", "spacy_data", "dev")
+# Окна (символов до якоря, символов после), которые сравниваем с полным текстом
+WINDOW_SIZES = [(30, 20), (60, 40), (100, 60), (150, 100), (300, 200)]
+REPEATS = 3
+BATCH_SIZE = 16
+LABEL = "PRODUCT"
+
+
+def predict(nlp, texts, regions, repeats: int):
+    """Сущности модели по всем текстам и медианное время прохода."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        predictions = list(extract_spans(nlp, texts, batch_size=BATCH_SIZE, label=LABEL, regions=regions))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return predictions, timings[len(timings) // 2]
+
+
+def as_set(spans_per_text):
+    return {(i, start, end) for i, spans in enumerate(spans_per_text) for start, end, _ in spans}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recall/latency trade-off of running NER only on windows around product anchors."
+    )
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--dev", default=DEV_DATA_PATH)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--untrained", action="store_true",
+                        help="Build the pipeline from the model's config.cfg with random weights (latency only)")
+    args = parser.parse_args()
+
+    nlp = None
+    try:
+        if args.untrained:
+            nlp = spacy.util.load_model_from_config(spacy.util.load_config(os.path.join(args.model, "config.cfg")))
+            nlp.initialize()
+        else:
+            nlp = spacy.load(args.model)
+    except Exception as e:
+        print(f"Error loading model from {args.model}: {e}")
+        print("Reporting anchor coverage only.")
+
+    vocab = nlp.vocab if nlp is not None else spacy.blank("en").vocab
+    dev_docs = [doc for doc in read_docs(args.dev, vocab) if doc.text.strip()]
+    texts = [doc.text for doc in dev_docs]
+    gold = {(i, ent.start_char, ent.end_char) for i, doc in enumerate(dev_docs) for ent in doc.ents if ent.label_ == LABEL}
+    total_chars = sum(len(text) for text in texts)
+    print(f"Loaded {len(texts)} documents ({total_chars} chars, {len(gold)} gold entities) from {args.dev}")
+
+    header = f"{'window':<12}{'text kept':>10}{'gold covered':>14}"
+    if nlp is not None:
+        header += f"{'P':>8}{'R':>8}{'F':>8}{'vs full':>9}{'seconds':>9}{'speedup':>9}"
+    print("\n" + header)
+
+    full_predictions = full_time = None
+    if nlp is not None:
+        full_predictions, full_time = predict(nlp, texts, None, args.repeats)
+        precision, recall, f_score = prf(as_set(full_predictions), gold)
+        print(f"{'full text':<12}{'100.0%':>10}{'100.0%':>14}"
+              f"{precision:>8.3f}{recall:>8.3f}{f_score:>8.3f}{'1.000':>9}{full_time:>9.3f}{'1.0x':>9}")
+
+    for before, after in WINDOW_SIZES:
+        regions = partial(anchor_windows, before=before, after=after)
+        windows = [regions(text) for text in texts]
+        kept = sum(end - start for text_windows in windows for start, end in text_windows)
+        covered = sum(
+            any(start <= g_start and g_end <= end for start, end in windows[i])
+            for i, g_start, g_end in gold
+        )
+        row = f"{f'{before}/{after}':<12}{kept / total_chars:>10.1%}{covered / len(gold) if gold else 0:>14.1%}"
+        if nlp is not None:
+            predictions, seconds = predict(nlp, texts, regions, args.repeats)
+            precision, recall, f_score = prf(as_set(predictions), gold)
+            # Доля сущностей полного прогона, которые модель нашла и на окнах
+            agreement = prf(as_set(predictions), as_set(full_predictions))[1]
+            row += (f"{precision:>8.3f}{recall:>8.3f}{f_score:>8.3f}{agreement:>9.3f}"
+                    f"{seconds:>9.3f}{f'{full_time / seconds:.1f}x':>9}")
+        print(row)
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import spacy
+from spacy.attrs import NORM, ORTH, intify_attrs
+from spacy.lang.norm_exceptions import BASE_NORMS
+from spacy.symbols import IDS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.numpy_ner import CONFIG_FILE, FORMAT_VERSION, MOVE_NAMES, WEIGHTS_FILE
+
+# --- Конфигурация ---
+MODEL_PATH = os.path.join("../training", "model-best")
+OUTPUT_DIR = os.path.join("../training", "model-numpy")
+# Признаки, которые умеет считать extractor.numpy_ner
+SUPPORTED_ATTRS = {"ORTH", "LOWER", "NORM", "PREFIX", "SUFFIX", "SHAPE"}
+
+
+class UnsupportedModel(ValueError):
+    pass
+
+
+def pattern_of(function):
+    """Регулярное выражение за prefix_search/suffix_search/... токенизатора: [pattern, flags]."""
+    if function is None:
+        return None
+    compiled = getattr(function, "__self__", None)
+    if compiled is None or not hasattr(compiled, "pattern"):
+        raise UnsupportedModel(f"Tokenizer callback {function!r} is not a compiled regex method")
+    return [compiled.pattern, compiled.flags]
+
+
+def export_tokenizer(nlp) -> dict:
+    tokenizer = nlp.tokenizer
+    rules = {}
+    for string, substrings in tokenizer.rules.items():
+        tokens = []
+        for substring in substrings:
+            attrs = intify_attrs(substring, strings_map=nlp.vocab.strings, _do_deprecated=True)
+            norm = attrs.get(NORM)
+            tokens.append([
+                nlp.vocab.strings.as_string(attrs[ORTH]),
+                nlp.vocab.strings.as_string(norm) if norm is not None else None,
+            ])
+        rules[string] = tokens
+    return {
+        "prefix": pattern_of(tokenizer.prefix_search),
+        "suffix": pattern_of(tokenizer.suffix_search),
+        "infix": pattern_of(tokenizer.infix_finditer),
+        "token_match": pattern_of(tokenizer.token_match),
+        "url_match": pattern_of(tokenizer.url_match),
+        "rules": rules,
+    }
+
+
+def export_norms(nlp) -> dict:
+    """Исключения NORM лексем: BASE_NORMS и таблица lexeme_norm, если она есть в модели."""
+    norms = dict(BASE_NORMS)
+    if nlp.vocab.lookups.has_table("lexeme_norm"):
+        norms.update(nlp.vocab.lookups.get_table("lexeme_norm"))
+    return norms
+
+
+def nodes(model, name: str):
+    return [node for node in model.walk() if node.name == name]
+
+
+def single(model, name: str):
+    found = nodes(model, name)
+    if len(found) != 1:
+        raise UnsupportedModel(f"Expected one '{name}' layer in {model.name}, found {len(found)}")
+    return found[0]
+
+
+def param(model, name: str) -> np.ndarray:
+    return np.ascontiguousarray(model.get_param(name), dtype=np.float32)
+
+
+def export_tok2vec(tok2vec, weights: dict) -> dict:
+    """MultiHashEmbed.v2 без статических векторов + MaxoutWindowEncoder.v2."""
+    embed = tok2vec.get_ref("embed")
+    encode = tok2vec.get_ref("encode")
+    if any(node.name.startswith("static_vectors") for node in embed.walk()):
+        raise UnsupportedModel("Static vectors (include_static_vectors = true) are not supported")
+
+    columns = single(embed, "extract_features").attrs["columns"]
+    attrs = [column if isinstance(column, str) else spacy.attrs.NAMES[column] for column in columns]
+    unsupported = set(attrs) - SUPPORTED_ATTRS
+    if unsupported:
+        raise UnsupportedModel(f"Unsupported tok2vec attributes: {sorted(unsupported)}")
+    hash_embeds = nodes(embed, "hashembed")
+    if [node.attrs["column"] for node in hash_embeds] != list(range(len(attrs))):
+        raise UnsupportedModel("Expected one HashEmbed per attribute, in attribute order")
+    for i, node in enumerate(hash_embeds):
+        weights[f"embed_{i}"] = param(node, "E")
+
+    mix = single(embed, "maxout")
+    mix_norm = single(embed, "layernorm")
+    weights["mix_W"], weights["mix_b"] = param(mix, "W"), param(mix, "b")
+    weights["mix_G"], weights["mix_beta"] = param(mix_norm, "G"), param(mix_norm, "b")
+
+    blocks = [node for node in encode.walk() if node.name.startswith("residual(") and len(node.layers) == 1]
+    windows = {single(block, "expand_window").attrs["window_size"] for block in blocks}
+    if not blocks or len(windows) != 1:
+        raise UnsupportedModel("Expected a MaxoutWindowEncoder with one window size")
+    for i, block in enumerate(blocks):
+        maxout = single(block, "maxout")
+        norm = single(block, "layernorm")
+        weights[f"encode_{i}_W"], weights[f"encode_{i}_b"] = param(maxout, "W"), param(maxout, "b")
+        weights[f"encode_{i}_G"], weights[f"encode_{i}_beta"] = param(norm, "G"), param(norm, "b")
+    return {
+        "embed": {"attrs": attrs, "seeds": [node.attrs["seed"] for node in hash_embeds]},
+        "encode": {"depth": len(blocks), "window_size": windows.pop(), "pad": encode.attrs["pad"]},
+    }
+
+
+def export_ner(ner, weights: dict) -> dict:
+    """TransitionBasedParser.v2 (state_type = "ner", use_upper = true) с жадным разбором."""
+    model = ner.model
+    if model.name != "parser_model" or not model.attrs.get("has_upper"):
+        raise UnsupportedModel("Expected spacy.TransitionBasedParser with use_upper = true")
+    if ner.cfg.get("beam_width", 1) != 1:
+        raise UnsupportedModel("Beam search NER is not supported")
+    if not nodes(model.get_ref("tok2vec"), "tok2vec-listener"):
+        raise UnsupportedModel("The ner component must listen to the shared tok2vec component")
+
+    lower = model.get_ref("lower")
+    if lower.get_dim("nF") != 3:
+        raise UnsupportedModel("Expected 3 state features (state_type = ner, extra_state_tokens = false)")
+    linear = single(model.get_ref("tok2vec"), "linear")
+    upper = model.get_ref("upper")
+    weights["lower_W"], weights["lower_b"] = param(linear, "W"), param(linear, "b")
+    weights["hidden_W"], weights["hidden_b"] = param(lower, "W"), param(lower, "b")
+    weights["hidden_pad"] = param(lower, "pad")
+    weights["upper_W"], weights["upper_b"] = param(upper, "W"), param(upper, "b")
+
+    moves = []
+    for i in range(ner.moves.n_moves):
+        name = ner.moves.get_class_name(i)
+        move, _, label = name.partition("-")
+        if move not in MOVE_NAMES:
+            raise UnsupportedModel(f"Unknown NER move: {name}")
+        moves.append([move, label])
+    return {
+        "labels": list(ner.labels),
+        "moves": moves,
+        "unseen_classes": sorted(int(clas) for clas in model.attrs.get("unseen_classes", ())),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export a trained tok2vec + ner spaCy pipeline for the NumPy runtime (extractor.numpy_ner)."
+    )
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    print(f"Loading spaCy model from: {args.model}")
+    try:
+        nlp = spacy.load(args.model)
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        sys.exit(1)
+    ignored = [name for name in nlp.pipe_names if name not in ("tok2vec", "ner")]
+    if ignored:
+        print(f"Warning: components {ignored} are not exported and will not run in the NumPy model")
+
+    weights = {}
+    try:
+        config = {
+            "format": FORMAT_VERSION,
+            "meta": {key: nlp.meta.get(key) for key in ("lang", "name", "version", "spacy_version")},
+            "tokenizer": export_tokenizer(nlp),
+            "norms": export_norms(nlp),
+            "symbols": dict(IDS),
+            **export_tok2vec(nlp.get_pipe("tok2vec").model, weights),
+            **export_ner(nlp.get_pipe("ner"), weights),
+        }
+    except (UnsupportedModel, KeyError) as e:
+        print(f"Cannot export {args.model}: {e}")
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    np.savez(os.path.join(args.output, WEIGHTS_FILE), **weights)
+    # meta.json нужен для версии модели в кэше результатов (extractor.result_cache)
+    shutil.copyfile(os.path.join(args.model, "meta.json"), os.path.join(args.output, "meta.json"))
+
+    size = sum(os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output))
+    print(f"Exported {len(weights)} weight arrays ({size / 1e6:.1f} MB) to {args.output}")
+    print("Check it against spaCy with: python check_numpy_parity.py")
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+# Поля /proc/<pid>/smaps_rollup (в kB), которые показываем
+FIELDS = ["Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"]
+
+
+def read_smaps_rollup(pid: int) -> Dict[str, int]:
+    """Читает сводку памяти процесса (Linux, ядро 4.14+)."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children", "r") as f:
+            children += [int(child) for child in f.read().split()]
+    return children
+
+
+def format_mb(kb: int) -> str:
+    return f"{kb / 1024:8.1f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Per-worker RSS/PSS of a running Gunicorn master and its workers."
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--pid", type=int, help="Gunicorn master PID")
+    group.add_argument("--pidfile", help="Gunicorn --pid file")
+    args = parser.parse_args()
+
+    master = args.pid
+    if args.pidfile:
+        with open(args.pidfile, "r") as f:
+            master = int(f.read().strip())
+
+    try:
+        processes = [("master", master)] + [("worker", pid) for pid in child_pids(master)]
+        rows = [(role, pid, read_smaps_rollup(pid)) for role, pid in processes]
+    except (FileNotFoundError, PermissionError) as e:
+        print(f"Could not read /proc for PID {master}: {e}")
+        sys.exit(1)
+
+    print(f"{'role':<8}{'pid':>8}" + "".join(f"{field + ' MB':>18}" for field in FIELDS))
+    for role, pid, values in rows:
+        print(f"{role:<8}{pid:>8}" + "".join(f"{format_mb(values.get(field, 0)):>18}" for field in FIELDS))
+
+    workers = [values for role, _, values in rows if role == "worker"]
+    if workers:
+        total_pss = sum(values.get("Pss", 0) for _, _, values in rows)
+        avg_private = sum(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0) for values in workers) / len(workers)
+        print(f"\nWorkers: {len(workers)}")
+        print(f"Average private memory per worker: {avg_private / 1024:.1f} MB")
+        print(f"Total PSS (actual memory used by master + workers): {total_pss / 1024:.1f} MB")
@@ -1,215 +1,370 @@
+import argparse
+import hashlib
 import json
-import spacy
-from spacy.tokens import DocBin, Span
-import random
 import os
-from sklearn.model_selection import train_test_split
-
-
-LABEL_STUDIO_EXPORT_FILE = os.path.join(
-    "../data", "annotated", "spacy_training_data.json"
-)
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 
+import spacy
+from spacy.tokens import DocBin
 
+# --- Конфигурация ---
+# Вывод converter.py (или экспорт Label Studio в .json)
+LABEL_STUDIO_EXPORT_FILE = os.path.join("../data", "annotated", "spacy_training_data.jsonl")
 OUTPUT_DIR = os.path.join("../data", "spacy_data")
+# Каталоги с шардами: spacy.Corpus (--paths.train / --paths.dev) читает все .spacy внутри
+TRAIN_DIR = os.path.join(OUTPUT_DIR, "train")
+DEV_DIR = os.path.join(OUTPUT_DIR, "dev")
+# Спаны, которые не легли на границы токенов, и отброшенные записи (JSON Lines)
+ALIGNMENT_REPORT_FILE = os.path.join(OUTPUT_DIR, "alignment_errors.jsonl")
+# Закрепленное разбиение: md5 текста -> train/dev. Тексты, на которых уже обучена
+# training/model-best, не должны попадать в dev при пересборке
+SPLIT_MANIFEST_FILE = os.path.join(OUTPUT_DIR, "split_manifest.json")
+DEV_SPLIT = 0.2  # Доля dev для текстов, которых еще нет в манифесте
+TARGET_LABEL = "PRODUCT"
+# Токенизатор пустой модели: у en_core_web_sm он тот же, а грузится в разы быстрее
+LANG = "en"
+SHARD_SIZE = 5000  # Документов в одном .spacy файле
+CHUNK_SIZE = 500  # Записей в одной задаче воркера
+N_PROCESS = os.cpu_count() or 1
+READ_SIZE = 1 << 20  # Символов, читаемых из JSON за раз
+# Предел одной записи JSON-массива: дальше это скорее битый JSON, чем запись
+MAX_RECORD_CHARS = 256 << 20
 
+# Токенизатор воркера (создается один раз в init_worker)
+_nlp = None
 
-TRAIN_DATA_FILE = os.path.join(OUTPUT_DIR, "train.spacy")
-DEV_DATA_FILE = os.path.join(OUTPUT_DIR, "dev.spacy")
 
+class InputFormatError(ValueError):
+    """Входной файл не удалось разобрать как JSON-массив или JSON Lines."""
 
-DEV_SPLIT = 0.2
 
+def iter_json_array(f, max_record_chars: int = MAX_RECORD_CHARS):
+    """
+    Потоково отдает элементы JSON-массива, не загружая файл целиком.
+    Если запись не дочитана, буфер дочитывается на столько же, сколько уже
+    накоплено, - повторных разборов одной записи O(log размера), а не O(размера).
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise InputFormatError("Expected a JSON array")
+    pos = 1
+    consumed = 0  # Символов, уже отброшенных из начала буфера
+    eof = False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise InputFormatError(f"Could not decode JSON at character {consumed + e.pos}: {e.msg}") from e
+            pending = len(buffer) - pos
+            if pending >= max_record_chars:
+                raise InputFormatError(
+                    f"Record at character {consumed + pos} is not complete after {pending} characters "
+                    f"(limit {max_record_chars}); the JSON is probably malformed"
+                ) from e
+            more = f.read(min(max(READ_SIZE, pending), max_record_chars - pending))
+            eof = not more
+            consumed += pos
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        yield record
 
-TARGET_LABEL = "PRODUCT"
 
+def iter_records(filepath: str):
+    """Записи Label Studio из JSON-списка или JSON Lines, по одной."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        if filepath.endswith(".jsonl"):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise InputFormatError(f"Could not decode line {line_number}: {e}") from e
+        else:
+            yield from iter_json_array(f)
 
-NLP_MODEL = "en_core_web_sm"
 
-try:
-    nlp = spacy.load(NLP_MODEL)
-    print(f"Loaded spaCy model '{NLP_MODEL}' for tokenization.")
-except OSError:
-    print(f"spaCy model '{NLP_MODEL}' not found. Trying blank 'en' model.")
-    nlp = spacy.blank("en")
-    print(
-        "Using blank 'en' model. Consider downloading a pretrained model for better tokenization: python -m spacy download en_core_web_sm"
-    )
+def convert_record(record, problems: list):
+    """
+    Приводит запись Label Studio к (text, [(start, end, label), ...]).
+    Возвращает None, если в записи нет текста; отброшенные сущности
+    добавляются в problems.
+    """
+    text = record.get("text") if isinstance(record, dict) else None
+    if not text or not isinstance(text, str):
+        problems.append({"reason": "missing or invalid text"})
+        return None
+
+    entities = record.get("entities")
+    formatted_entities = []
+    if isinstance(entities, list):
+        for ent in entities:
+            if not (isinstance(ent, list) and len(ent) == 3):
+                problems.append({"entity": ent, "reason": "malformed entity entry"})
+                continue
+            start, end, label = ent
+            if not (isinstance(start, int) and isinstance(end, int) and isinstance(label, str)):
+                problems.append({"entity": ent, "reason": "invalid entity types"})
+            elif label == TARGET_LABEL:
+                if 0 <= start < len(text) and start < end <= len(text):
+                    formatted_entities.append((start, end, label))
+                else:
+                    problems.append({"entity": ent, "reason": "invalid entity indices"})
+    elif entities is not None:
+        problems.append({"reason": "'entities' field is not a list"})
+    return text, formatted_entities
 
 
+def load_split_manifest(filepath: str) -> dict:
+    """{md5 текста: "train" | "dev"} из манифеста; пустой словарь, если файла нет."""
+    if not os.path.exists(filepath):
+        return {}
+    with open(filepath, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {key: split for split in ("train", "dev") for key in manifest.get(split, [])}
 
 
+def save_split_manifest(filepath: str, assignments: dict):
+    manifest = {split: sorted(key for key, value in assignments.items() if value == split) for split in ("train", "dev")}
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(temp_path, filepath)
 
-def load_label_studio_data(filepath: str) -> list:
-    """Загружает данные из JSON, экспортированного из Label Studio."""
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        print(f"Loaded {len(data)} records from {filepath}")
-        # Проверка формата первого элемента (опционально)
-        if data and isinstance(data, list) and isinstance(data[0], dict):
-            print("Data seems to be in the expected list-of-dictionaries format.")
-        elif data:
-            print(
-                "Warning: Data format might differ from expected list-of-dictionaries."
-            )
-        return data
-    except FileNotFoundError:
-        print(f"Error: File not found at {filepath}")
-        return []
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {filepath}")
-        return []
-    except Exception as e:
-        print(f"An unexpected error occurred while loading data: {e}")
-        return []
-
-
-def convert_to_spacy_format(data: list) -> list:
+
+def assign_split(text: str, dev_split: float, assignments: dict) -> str:
     """
-    Преобразует данные из формата Label Studio (как в примере пользователя)
-    в формат списка кортежей spaCy: [(text, {"entities": [(start, end, label), ...]})].
+    Split текста из манифеста. Новый текст получает split по хэшу (воспроизводимо,
+    без всех записей в памяти), и он запоминается в assignments.
     """
-    spacy_data = []
-    skipped_count = 0
-    for record in data:
-        text = record.get("text")
-        entities = record.get(
-            "entities"
-        )
-
-        if not text or not isinstance(text, str):
-            print(f"Warning: Skipping record due to missing or invalid text: {record}")
-            skipped_count += 1
-            continue
-
-        formatted_entities = []
-        if isinstance(entities, list):
-            for ent in entities:
-
-                if isinstance(ent, list) and len(ent) == 3:
-                    start, end, label = ent
-
-                    if (
-                        isinstance(start, int)
-                        and isinstance(end, int)
-                        and isinstance(label, str)
-                    ):
-                        if label == TARGET_LABEL:
-
-                            if 0 <= start < len(text) and start < end <= len(text):
-                                formatted_entities.append((start, end, label))
-                            else:
-                                print(
-                                    f"Warning: Skipping invalid entity indices {ent} for text snippet: '{text[:50]}...'"
-                                )
-
-                    else:
-                        print(f"Warning: Skipping entity with invalid types: {ent}")
-                else:
-                    print(f"Warning: Skipping malformed entity entry: {ent}")
-        elif entities is not None:
-            print(f"Warning: 'entities' field is not a list in record: {record}")
-
-
-        spacy_data.append((text, {"entities": formatted_entities}))
+    key = hashlib.md5(text.encode("utf-8")).hexdigest()
+    split = assignments.get(key)
+    if split is None:
+        split = "dev" if int(key[:8], 16) < dev_split * 2 ** 32 else "train"
+        assignments[key] = split
+    return split
 
-    if skipped_count > 0:
-        print(f"Skipped {skipped_count} records due to missing/invalid text.")
-    print(f"Converted {len(spacy_data)} records to spaCy format.")
-    return spacy_data
 
+def init_worker(lang: str):
+    global _nlp
+    _nlp = spacy.blank(lang)
 
-def create_docbin(data: list, output_file: str):
-    """Создает и сохраняет DocBin из данных в формате spaCy."""
-    db = DocBin()
-    skipped_spans = 0
-    total_spans = 0
 
-    for text, annotations in data:
-        doc = nlp.make_doc(text)
+def build_chunk(chunk: list):
+    """
+    Токенизирует записи [(index, text, entities, split)] и возвращает
+    ({split: DocBin в байтах}, {split: число документов}, [ошибки выравнивания]).
+    """
+    doc_bins = {}
+    errors = []
+    for index, text, entities, split in chunk:
+        doc = _nlp.make_doc(text)
         ents = []
-        entity_indices = annotations.get("entities", [])
-        total_spans += len(entity_indices)
-
-        for start, end, label in entity_indices:
+        for start, end, label in entities:
             span = doc.char_span(start, end, label=label, alignment_mode="contract")
             if span is None:
-                print(
-                    f"Warning: Skipping entity span [{start}, {end}, {label}] for text: '{text[start-10:end+10]}...' (Could not form span)"
-                )
-                skipped_spans += 1
+                errors.append({
+                    "index": index, "split": split, "entity": [start, end, label],
+                    "span_text": text[start:end], "reason": "not on token boundaries",
+                })
             else:
                 ents.append(span)
-
-
         try:
             doc.ents = ents
         except ValueError as e:
+            # Как и раньше, документ сохраняется без сущностей
+            errors.append({
+                "index": index, "split": split, "entity": [[span.start_char, span.end_char, span.label_] for span in ents],
+                "reason": f"could not set entities: {e}",
+            })
+        doc_bins.setdefault(split, DocBin()).add(doc)
+    return (
+        {split: doc_bin.to_bytes() for split, doc_bin in doc_bins.items()},
+        {split: len(doc_bin) for split, doc_bin in doc_bins.items()},
+        errors,
+    )
 
-            print(
-                f"Warning: Could not set entities for doc (possibly overlapping spans?): {e}"
-            )
-
-            print(f"Text snippet: {text[:100]}...")
-            print(
-                f"Problematic ents: {[(e.start_char, e.end_char, e.label_) for e in ents]}"
-            )
 
-        db.add(doc)
+class ShardWriter:
+    """
+    Собирает DocBin из кусков воркеров и пишет shard-NNNNN.spacy по shard_size
+    документов во временный каталог рядом с output_dir. commit_shards() заменяет
+    им output_dir целиком, discard() удаляет его: при сбое старый корпус остается.
+    """
 
-    db.to_disk(output_file)
-    print(f"Saved {len(data)} documents to {output_file}")
-    if skipped_spans > 0:
-        print(
-            f"Skipped {skipped_spans}/{total_spans} entity spans due to alignment issues."
-        )
-    if skipped_spans == total_spans and total_spans > 0:
-        print(
-            "ERROR: All entity spans were skipped. Check your annotation indices and text processing."
-        )
+    def __init__(self, output_dir: str, shard_size: int):
+        self.output_dir = os.path.normpath(output_dir)
+        self.shard_size = shard_size
+        self.doc_bin = DocBin()
+        self.pending = 0
+        self.shards = 0
+        self.docs = 0
+        parent = os.path.dirname(self.output_dir) or "."
+        os.makedirs(parent, exist_ok=True)
+        # Тот же каталог-родитель: os.replace работает в пределах одной файловой системы
+        self.temp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(self.output_dir)}-", dir=parent)
+
+    def add(self, data: bytes, count: int):
+        self.doc_bin.merge(DocBin().from_bytes(data))
+        self.pending += count
+        if self.pending >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.doc_bin.to_disk(os.path.join(self.temp_dir, f"shard-{self.shards:05d}.spacy"))
+        self.docs += self.pending
+        self.shards += 1
+        self.doc_bin = DocBin()
+        self.pending = 0
+
+    def discard(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def commit_shards(writers):
+    """
+    Ставит каталоги всех writers на место старых вместе: если какое-то
+    переименование не удалось, уже замененные откатываются, и train/dev
+    остаются парой из одной сборки.
+    """
+    for writer in writers:
+        writer.flush()
+    moved_aside = []
+    installed = []
+    try:
+        for writer in writers:
+            if os.path.exists(writer.output_dir):
+                # Каталог нельзя заменить непустым через os.replace - сначала убираем старый в сторону
+                old_dir = f"{writer.temp_dir}-old"
+                os.replace(writer.output_dir, old_dir)
+                moved_aside.append((writer.output_dir, old_dir))
+        for writer in writers:
+            os.replace(writer.temp_dir, writer.output_dir)
+            installed.append(writer)
+    except BaseException:
+        for writer in installed:
+            os.replace(writer.output_dir, writer.temp_dir)
+        for output_dir, old_dir in moved_aside:
+            os.replace(old_dir, output_dir)
+        raise
+    for _, old_dir in moved_aside:
+        shutil.rmtree(old_dir)
+
+
+def iter_chunks(records, split_of, chunk_size: int, report):
+    """Валидирует записи и режет их на задачи для воркеров."""
+    def tasks():
+        for index, record in enumerate(records):
+            problems = []
+            converted = convert_record(record, problems)
+            for problem in problems:
+                report(dict(index=index, **problem))
+            if converted is not None:
+                text, entities = converted
+                yield index, text, entities, split_of(text)
+
+    tasks = tasks()
+    while True:
+        chunk = list(islice(tasks, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 
 if __name__ == "__main__":
-    print("--- Starting Data Preparation ---")
-
-
-    raw_data = load_label_studio_data(LABEL_STUDIO_EXPORT_FILE)
-
-    if not raw_data:
-        print("No data loaded. Exiting.")
-        exit()
-
-
-    spacy_formatted_data = convert_to_spacy_format(raw_data)
-
-    if not spacy_formatted_data:
-        print("No data after conversion. Exiting.")
-        exit()
-
-
-    random.shuffle(spacy_formatted_data)
-
-
-    train_data, dev_data = train_test_split(
-        spacy_formatted_data, test_size=DEV_SPLIT, random_state=42
+    parser = argparse.ArgumentParser(
+        description="Build sharded train/dev .spacy corpora from the Label Studio export."
     )
-    print(
-        f"Data split complete: {len(train_data)} training examples, {len(dev_data)} development examples."
-    )
-
-
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    print(f"Output directory: {OUTPUT_DIR}")
+    parser.add_argument("--input", default=LABEL_STUDIO_EXPORT_FILE, help="Label Studio export (.json list or .jsonl)")
+    parser.add_argument("--train-dir", default=TRAIN_DIR)
+    parser.add_argument("--dev-dir", default=DEV_DIR)
+    parser.add_argument("--report", default=ALIGNMENT_REPORT_FILE, help="Where to write skipped spans and records")
+    parser.add_argument("--split-manifest", default=SPLIT_MANIFEST_FILE, help="Pinned train/dev membership, updated with new texts")
+    parser.add_argument("--dev-split", type=float, default=DEV_SPLIT, help="Dev share for texts not in the manifest")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--n-process", type=int, default=N_PROCESS)
+    args = parser.parse_args()
 
+    print("--- Starting Data Preparation ---")
+    if not os.path.exists(args.input):
+        print(f"Error: File not found at {args.input}")
+        exit(1)
+
+    writers = {"train": ShardWriter(args.train_dir, args.shard_size), "dev": ShardWriter(args.dev_dir, args.shard_size)}
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    report_temp = f"{args.report}.tmp"
+    report_counts = {}
+    assignments = load_split_manifest(args.split_manifest)
+    pinned = len(assignments)
+    completed = False
 
-    print("\n--- Creating Training Data (train.spacy) ---")
-    create_docbin(train_data, TRAIN_DATA_FILE)
-
-
-    print("\n--- Creating Development Data (dev.spacy) ---")
-    create_docbin(dev_data, DEV_DATA_FILE)
-
-    print("\n--- Data Preparation Finished ---")
-    print(f"Training data saved to: {TRAIN_DATA_FILE}")
-    print(f"Development data saved to: {DEV_DATA_FILE}")
+    try:
+        with open(report_temp, "w", encoding="utf-8") as report_file:
+            def report(entry):
+                report_counts[entry["reason"]] = report_counts.get(entry["reason"], 0) + 1
+                report_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+            def handle(result):
+                doc_bins, counts, errors = result
+                for split, data in doc_bins.items():
+                    writers[split].add(data, counts[split])
+                for error in errors:
+                    report(error)
+
+            split_of = partial(assign_split, dev_split=args.dev_split, assignments=assignments)
+            chunks = iter_chunks(iter_records(args.input), split_of, args.chunk_size, report)
+            try:
+                if args.n_process == 1:
+                    init_worker(LANG)
+                    for chunk in chunks:
+                        handle(build_chunk(chunk))
+                else:
+                    # Не больше двух задач на воркер в очереди: вход читается по мере обработки
+                    with ProcessPoolExecutor(args.n_process, initializer=init_worker, initargs=(LANG,)) as executor:
+                        pending = deque()
+                        for chunk in chunks:
+                            pending.append(executor.submit(build_chunk, chunk))
+                            if len(pending) >= 2 * args.n_process:
+                                handle(pending.popleft().result())
+                        while pending:
+                            handle(pending.popleft().result())
+            except InputFormatError as e:
+                print(f"Error: {args.input}: {e}")
+                exit(1)
+
+        # Старые train/dev заменяются только после успешной сборки обоих и только вместе
+        commit_shards(list(writers.values()))
+        os.replace(report_temp, args.report)
+        save_split_manifest(args.split_manifest, assignments)
+        completed = True
+    finally:
+        if not completed:
+            for writer in writers.values():
+                writer.discard()
+            if os.path.exists(report_temp):
+                os.remove(report_temp)
+
+    for split, writer in writers.items():
+        print(f"{split}: {writer.docs} documents in {writer.shards} shards in {writer.output_dir}")
+    print(f"Split manifest: {pinned} pinned texts, {len(assignments) - pinned} newly assigned ({args.split_manifest})")
+    if report_counts:
+        summary = ", ".join(f"{count} {reason}" for reason, count in sorted(report_counts.items()))
+        print(f"Skipped: {summary}. Details: {args.report}")
+    print("--- Data Preparation Finished ---")
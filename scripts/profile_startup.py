@@ -0,0 +1,70 @@
+import argparse
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANAGE_PY = os.path.join(PROJECT_ROOT, "manage.py")
+DEFAULT_COMMANDS = ["check", "showmigrations"]
+REPEATS = 3
+TOP_IMPORTS = 15
+
+# Строка вывода python -X importtime: "import time: self | cumulative | module"
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_command(command: List[str], extra_args: List[str] = None) -> Tuple[float, str]:
+    """Запускает manage.py <command> в отдельном процессе, возвращает (секунды, stderr)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable] + (extra_args or []) + [MANAGE_PY] + command,
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        print(f"  manage.py {' '.join(command)} exited with {result.returncode}")
+    return elapsed, result.stderr
+
+
+def top_imports(stderr: str, limit: int) -> List[Tuple[int, str]]:
+    """Самые тяжелые импорты верхнего уровня по кумулятивному времени (мкс)."""
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        # Отступ в одну позицию - импорт верхнего уровня, вложенные не считаем дважды
+        if match and len(match.group(3)) == 1:
+            imports.append((int(match.group(2)), match.group(4)))
+    return sorted(imports, reverse=True)[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Wall time, peak RSS and heaviest imports of Django management commands."
+    )
+    parser.add_argument("commands", nargs="*", default=DEFAULT_COMMANDS,
+                        help=f"Management commands to profile (default: {' '.join(DEFAULT_COMMANDS)})")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--top", type=int, default=TOP_IMPORTS, help="How many top-level imports to show")
+    args = parser.parse_args()
+
+    for name in args.commands:
+        command = name.split()
+        print(f"\n=== manage.py {name} ===")
+        # Первый запуск прогревает кэш файловой системы и .pyc, его не считаем
+        run_command(command)
+        timings = [run_command(command)[0] for _ in range(args.repeats)]
+        print(f"Wall time: median {statistics.median(timings):.2f} s, min {min(timings):.2f} s ({args.repeats} runs)")
+
+        _, stderr = run_command(command, ["-X", "importtime"])
+        print(f"Top {args.top} top-level imports (cumulative):")
+        for microseconds, module in top_imports(stderr, args.top):
+            print(f"  {microseconds / 1e6:7.3f} s  {module}")
+
+    # ru_maxrss для дочерних процессов - максимум по всем запускам (в KB на Linux)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(f"\nPeak RSS over all runs: {peak_rss_kb / 1024:.1f} MB")
@@ -1,18 +1,36 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
 import os
+import sys
 import logging
 import time
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor.html_text import DEFAULT_CONTENT_SELECTORS, DEFAULT_MAX_HTML_BYTES, extract_text
+from extractor.http_cache import HTTPCache
 
 URL_LIST_FILE = "../data/urls.txt"
 OUTPUT_DIR = os.path.join("../data", "raw_texts")
-OUTPUT_FILE = os.path.join(OUTPUT_DIR, "scraped_texts.json")
+OUTPUT_FILE = os.path.join(OUTPUT_DIR, "scraped_texts.jsonl")
+FAILED_URLS_FILE = os.path.join(OUTPUT_DIR, "failed_urls.txt")
+# Тот же файл, что HTTP_CACHE_PATH в furniture_api/settings.py
+HTTP_CACHE_FILE = os.path.join("..", ".cache", "http_cache.sqlite")
+HTTP_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+HTTP_CACHE_TTL = 7 * 24 * 60 * 60
 NUM_URLS_TO_PROCESS = 500
 TARGET_SUCCESSFUL_PAGES = 150
 REQUEST_TIMEOUT = 20
-SLEEP_INTERVAL = 1
+SLEEP_INTERVAL = 1  # Пауза между запросами к одному и тому же хосту
+CONCURRENCY = 16  # Общее число одновременных запросов
+# Разбор HTML - общий с сервисом (extractor/html_text.py), чтобы обучающий текст совпадал с тем, что видит модель
+CONTENT_SELECTORS = DEFAULT_CONTENT_SELECTORS
+MAX_HTML_BYTES = DEFAULT_MAX_HTML_BYTES
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 logging.basicConfig(
@@ -32,52 +50,16 @@ def load_urls(filepath: str) -> List[str]:
         logging.error(f"Error reading URL file {filepath}: {e}")
         return []
 
-def extract_text_from_html(html_content: str) -> Optional[str]:
-    if not html_content:
-        return None
-    try:
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form", "link", "meta"]):
-            tag.decompose()
-
-        main_content = soup.find("main")
-        if not main_content:
-            main_content = soup.find("article")
-        if not main_content:
-            common_containers = ["#content", "#main-content", ".content", ".main", ".product-details"]
-            for selector in common_containers:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
-        if not main_content:
-            main_content = soup.body
-
-        if main_content:
-            text = main_content.get_text(separator=" ", strip=True)
-            cleaned_text = " ".join(text.split())
-            if len(cleaned_text) > 50:
-                return cleaned_text
-            else:
-                logging.warning("Extracted text seems too short, might be non-content page.")
-                full_text = soup.get_text(separator=" ", strip=True)
-                cleaned_full_text = " ".join(full_text.split())
-                if len(cleaned_full_text) > 50:
-                    logging.warning("Falling back to full soup text extraction.")
-                    return cleaned_full_text
-                else:
-                    return None
-        else:
-            logging.warning("Could not find main content or body tag.")
-            return None
-    except Exception as e:
-        logging.error(f"Error parsing HTML: {e}")
-        return None
+http_cache: Optional[HTTPCache] = None  # Включается в __main__, если не задан --no-http-cache
+
 
 def scrape_url(url: str) -> Optional[Dict[str, str]]:
     try:
         headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if http_cache:
+            response = http_cache.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        else:
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         content_type = response.headers.get("content-type", "").lower()
         if "html" not in content_type:
@@ -85,7 +67,7 @@ def scrape_url(url: str) -> Optional[Dict[str, str]]:
             return None
         html_content = response.text
         logging.info(f"Successfully fetched URL: {url}")
-        extracted_text = extract_text_from_html(html_content)
+        extracted_text = extract_text(html_content, selectors=CONTENT_SELECTORS, max_bytes=MAX_HTML_BYTES)
         if extracted_text:
             return {"url": url, "text": extracted_text}
         else:
@@ -104,46 +86,177 @@ def scrape_url(url: str) -> Optional[Dict[str, str]]:
         logging.error(f"An unexpected error occurred while processing {url}: {e}")
         return None
 
+def load_processed_urls(output_file: str, failed_file: str) -> Tuple[set, List[str]]:
+    """
+    Читает уже сохраненные страницы (JSON Lines) и журнал неудачных URL (без повторов, в порядке файла).
+    Оборванную при сбое последнюю строку вывода отрезает, чтобы дописывать дальше.
+    """
+    done_urls = set()
+    failed_urls = []
+    if os.path.exists(output_file):
+        with open(output_file, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                logging.warning(f"Dropped incomplete last line of {output_file}")
+        with open(output_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done_urls.add(json.loads(line)["url"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    logging.warning(f"Skipping malformed line in {output_file}")
+    if os.path.exists(failed_file):
+        with open(failed_file, "r", encoding="utf-8") as f:
+            failed_urls = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    return done_urls, failed_urls
+
+
+def save_failed_urls(failed_file: str, urls: Iterable[str]) -> None:
+    """Перезаписывает журнал неудачных URL через временный файл."""
+    tmp_path = failed_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for url in urls:
+            f.write(url + "\n")
+    os.replace(tmp_path, failed_file)
+
+
+def crawl(
+    urls: Iterable[str],
+    fetch: Callable[[str], Optional[Dict[str, str]]] = scrape_url,
+    concurrency: int = CONCURRENCY,
+    per_host_delay: float = SLEEP_INTERVAL,
+) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+    """
+    Скачивает URL параллельно и отдает (url, результат) по мере готовности.
+    Одновременно идет не больше concurrency запросов; к одному хосту - не больше
+    одного, и следующий запрос к нему начинается не раньше чем через
+    per_host_delay секунд после окончания предыдущего.
+    Если генератор закрыть раньше времени, ожидающие URL не скачиваются.
+    """
+    host_queues: Dict[str, deque] = {}
+    for url in urls:
+        host_queues.setdefault(urlparse(url).netloc.lower(), deque()).append(url)
+
+    ready_at: Dict[str, float] = {host: 0.0 for host in host_queues}
+    busy_hosts = set()
+    in_flight = {}
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        while host_queues or in_flight:
+            now = time.monotonic()
+            for host in list(host_queues):
+                if len(in_flight) >= concurrency:
+                    break
+                if host in busy_hosts or ready_at[host] > now:
+                    continue
+                url = host_queues[host].popleft()
+                if not host_queues[host]:
+                    del host_queues[host]
+                busy_hosts.add(host)
+                in_flight[executor.submit(fetch, url)] = (host, url)
+
+            # Ждем завершения запроса или момента, когда освободится хост
+            waiting = [ready_at[h] for h in host_queues if h not in busy_hosts]
+            if waiting and len(in_flight) < concurrency:
+                timeout = max(0.0, min(waiting) - now)
+            else:
+                timeout = None
+            if not in_flight:
+                time.sleep(timeout or 0)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                host, url = in_flight.pop(future)
+                busy_hosts.discard(host)
+                ready_at[host] = time.monotonic() + per_host_delay
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Unexpected error in worker for {url}: {e}")
+                    result = None
+                yield url, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape product pages listed in urls.txt.")
+    parser.add_argument("--urls", default=URL_LIST_FILE, help="File with one URL per line")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Max simultaneous requests")
+    parser.add_argument("--delay", type=float, default=SLEEP_INTERVAL, help="Seconds between requests to one host")
+    parser.add_argument("--no-http-cache", action="store_true", help="Always download pages, bypassing the HTTP cache")
+    parser.add_argument("--http-cache-ttl", type=float, default=HTTP_CACHE_TTL, help="Seconds a cached page is used without revalidation")
+    parser.add_argument("--resume", action="store_true", help="Skip URLs already saved or logged as failed")
+    parser.add_argument("--retry-failed", action="store_true", help="With --resume, fetch logged failed URLs again")
+    args = parser.parse_args()
+
     logging.info("Starting scraper script...")
+    if not args.no_http_cache:
+        http_cache = HTTPCache(HTTP_CACHE_FILE, max_bytes=HTTP_CACHE_MAX_BYTES, ttl=args.http_cache_ttl)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     logging.info(f"Output directory set to: {OUTPUT_DIR}")
-    urls_to_scrape = load_urls(URL_LIST_FILE)
+    urls_to_scrape = load_urls(args.urls)
     if not urls_to_scrape:
         logging.info("No URLs to process. Exiting.")
         exit()
-    all_scraped_data: List[Dict[str, str]] = []
     processed_count = 0
     successful_count = 0
     failed_count = 0
-    logging.info(f"Attempting to scrape up to {NUM_URLS_TO_PROCESS} URLs to get {TARGET_SUCCESSFUL_PAGES} successful pages.")
-    for i, url in enumerate(urls_to_scrape):
-        if processed_count >= NUM_URLS_TO_PROCESS:
-            logging.info(f"Reached processing limit of {NUM_URLS_TO_PROCESS} URLs.")
-            break
+    urls_to_scrape = urls_to_scrape[:NUM_URLS_TO_PROCESS]
+    if args.resume:
+        done_urls, failed_urls = load_processed_urls(OUTPUT_FILE, FAILED_URLS_FILE)
+        skip_urls = done_urls if args.retry_failed else done_urls | set(failed_urls)
+        successful_count = len(done_urls)
+        urls_to_scrape = [url for url in urls_to_scrape if url not in skip_urls]
+        logging.info(f"Resuming: {len(done_urls)} pages saved, {len(failed_urls)} URLs failed before, {len(urls_to_scrape)} URLs left.")
         if successful_count >= TARGET_SUCCESSFUL_PAGES:
-            logging.info(f"Reached target of {TARGET_SUCCESSFUL_PAGES} successfully scraped pages.")
-            break
-        logging.info(f"Processing URL {i+1}/{len(urls_to_scrape)}: {url}")
-        processed_count += 1
-        result = scrape_url(url)
-        if result:
-            all_scraped_data.append(result)
-            successful_count += 1
-            logging.info(f"Success! Pages collected: {successful_count}/{TARGET_SUCCESSFUL_PAGES}")
-        else:
-            failed_count += 1
-        if i < len(urls_to_scrape) - 1:
-            logging.info(f"Sleeping for {SLEEP_INTERVAL} second(s)...")
-            time.sleep(SLEEP_INTERVAL)
+            logging.info(f"Target of {TARGET_SUCCESSFUL_PAGES} pages already reached.")
+            urls_to_scrape = []
+        # Дописываем к сохраненному; журнал неудач - только то, что по-прежнему не скачано
+        output_path, output_mode = OUTPUT_FILE, "a"
+        still_failed = dict.fromkeys(failed_urls)
+    else:
+        # Новый прогон пишет во временный файл: прежние результаты заменяются только в конце
+        output_path, output_mode = OUTPUT_FILE + ".tmp", "w"
+        still_failed = {}
+    logging.info(f"Attempting to scrape up to {len(urls_to_scrape)} URLs to get {TARGET_SUCCESSFUL_PAGES} successful pages.")
+    logging.info(f"Concurrency: {args.concurrency}, per-host delay: {args.delay} second(s).")
+    completed = False
+    try:
+        # Каждая страница сразу дописывается в файл: сбой не теряет уже скачанное
+        with open(output_path, output_mode, encoding="utf-8") as output:
+            results = crawl(urls_to_scrape, concurrency=args.concurrency, per_host_delay=args.delay)
+            for url, result in results:
+                processed_count += 1
+                logging.info(f"Processed URL {processed_count}/{len(urls_to_scrape)}: {url}")
+                if result:
+                    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    output.flush()
+                    still_failed.pop(url, None)
+                    successful_count += 1
+                    logging.info(f"Success! Pages collected: {successful_count}/{TARGET_SUCCESSFUL_PAGES}")
+                else:
+                    still_failed[url] = None
+                    failed_count += 1
+                if successful_count >= TARGET_SUCCESSFUL_PAGES:
+                    logging.info(f"Reached target of {TARGET_SUCCESSFUL_PAGES} successfully scraped pages.")
+                    results.close()
+                    break
+        completed = True
+    finally:
+        if args.resume or completed:
+            save_failed_urls(FAILED_URLS_FILE, still_failed)
+        if not args.resume:
+            if completed:
+                os.replace(output_path, OUTPUT_FILE)
+            else:
+                logging.warning(f"Scraping interrupted: {OUTPUT_FILE} left unchanged, partial results are in {output_path}")
     logging.info(f"Scraping finished. Total URLs processed: {processed_count}, Successful: {successful_count}, Failed: {failed_count}")
-    if all_scraped_data:
-        try:
-            with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-                json.dump(all_scraped_data, f, ensure_ascii=False, indent=4)
-            logging.info(f"Successfully saved {successful_count} scraped texts to {OUTPUT_FILE}")
-        except Exception as e:
-            logging.error(f"Error saving data to JSON file {OUTPUT_FILE}: {e}")
+    if http_cache:
+        logging.info(f"HTTP cache: {http_cache.hits} fresh hits, {http_cache.revalidated} revalidated (304), {http_cache.misses} downloaded")
+    if successful_count:
+        logging.info(f"Scraped texts are in {OUTPUT_FILE}, failed URLs in {FAILED_URLS_FILE}")
     else:
         logging.warning("No data was successfully scraped.")
     logging.info("Scraper script finished.")